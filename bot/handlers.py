@@ -3,7 +3,7 @@ Telegram bot message handlers.
 """
 import asyncio
 import logging
-from typing import List
+from typing import AsyncIterator, List
 
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
@@ -182,6 +182,91 @@ async def process_location(message: Message, state: FSMContext):
                 lines.append("")
             return "\n".join(lines)
         
+        async def check_restaurant(restaurant):
+            """
+            Look for the dish on one restaurant's site.
+            
+            Returns result dict ("found" is True/False) or None if the
+            restaurant has no usable website.
+            """
+            # Find website
+            website = await site_finder.find_website(restaurant)
+            
+            if not website:
+                return None
+                
+            # Check if it's a valid website (not social media)
+            if any(domain in website.lower() for domain in invalid_domains):
+                logger.info(f"[DEBUG] Пропущен (соц.сеть): {restaurant.name} -> {website}")
+                return None
+            
+            logger.info(f"[DEBUG] Ищу блюдо на: {website}")
+            
+            # Strategy 1: Search dish directly on main page (many sites list dishes without separate menu)
+            page_text = await menu_parser.get_menu_text(website)
+            dish_position = None
+            menu_url = website  # Default to main page
+            
+            if page_text:
+                dish_position = find_dish_in_text(dish_name, page_text)
+                if dish_position is not None:
+                    logger.info(f"[DEBUG] Блюдо найдено на главной: {restaurant.name}")
+            
+            # Strategy 2: If not found on main page, try to find dedicated menu page
+            if dish_position is None:
+                found_menu_url = await menu_parser.find_menu_url(website, dish_name)
+                if found_menu_url and found_menu_url != website:
+                    menu_url = found_menu_url
+                    menu_text = await menu_parser.get_menu_text(menu_url)
+                    if menu_text:
+                        dish_position = find_dish_in_text(dish_name, menu_text)
+                        page_text = menu_text  # Use menu text for price extraction
+            
+            # Strategy 3: Try Playwright if static content is very short
+            if dish_position is None and (not page_text or len(page_text) < 500):
+                logger.info(f"[DEBUG] Мало контента, пробуем браузер: {menu_url}")
+                page_text = await menu_parser.get_menu_text(menu_url, use_browser=True)
+                if page_text:
+                    dish_position = find_dish_in_text(dish_name, page_text)
+            
+            if dish_position is not None and page_text:
+                price, _ = extract_price(page_text, dish_position)
+                logger.info(f"[DEBUG] Найдено блюдо: {restaurant.name} -> {dish_name}, цена: {price}")
+                return {
+                    "name": restaurant.name,
+                    "website": website,
+                    "dish_name": dish_name,
+                    "price": price,
+                    "menu_url": menu_url,
+                    "found": True,
+                }
+            
+            # Check if this is an image-based menu (very little extractable text even after browser)
+            is_image_based_menu = (not page_text or len(page_text) < 300)
+            
+            if is_image_based_menu:
+                logger.info(f"[DEBUG] Меню в виде изображений: {restaurant.name} -> {website}")
+            else:
+                logger.info(f"[DEBUG] Блюдо не найдено в меню: {restaurant.name}")
+            
+            return {
+                "name": restaurant.name,
+                "website": website,
+                "menu_url": menu_url,
+                "found": False,
+                "is_image_menu": is_image_based_menu,
+            }
+        
+        semaphore = asyncio.Semaphore(3)  # Max 3 restaurants checked concurrently
+        
+        async def check_restaurant_limited(restaurant):
+            async with semaphore:
+                try:
+                    return await check_restaurant(restaurant)
+                except Exception as e:
+                    logger.error(f"Check failed for {restaurant.name}: {e}")
+                    return None
+        
         for current_radius in range(radius_step, max_radius + 1, radius_step):
             # Update status message with current results
             if restaurants_with_dish:
@@ -201,91 +286,41 @@ async def process_location(message: Message, state: FSMContext):
             if not restaurants:
                 continue
             
-            # Process only new restaurants (not checked before)
-            for restaurant in restaurants:
-                # Skip if already checked
-                if restaurant.id in checked_ids:
-                    continue
-                checked_ids.add(restaurant.id)
-                
-                # Stop if we found enough
-                if len(restaurants_with_dish) >= target_count:
-                    break
-                
-                # Find website
-                website = await site_finder.find_website(restaurant)
-                
-                if not website:
-                    continue
-                    
-                # Check if it's a valid website (not social media)
-                if any(domain in website.lower() for domain in invalid_domains):
-                    logger.info(f"[DEBUG] Пропущен (соц.сеть): {restaurant.name} -> {website}")
-                    continue
-                
-                logger.info(f"[DEBUG] Ищу блюдо на: {website}")
-                
-                # Strategy 1: Search dish directly on main page (many sites list dishes without separate menu)
-                page_text = await menu_parser.get_menu_text(website)
-                dish_position = None
-                menu_url = website  # Default to main page
-                
-                if page_text:
-                    dish_position = find_dish_in_text(dish_name, page_text)
-                    if dish_position is not None:
-                        logger.info(f"[DEBUG] Блюдо найдено на главной: {restaurant.name}")
-                
-                # Strategy 2: If not found on main page, try to find dedicated menu page
-                if dish_position is None:
-                    found_menu_url = await menu_parser.find_menu_url(website, dish_name)
-                    if found_menu_url and found_menu_url != website:
-                        menu_url = found_menu_url
-                        menu_text = await menu_parser.get_menu_text(menu_url)
-                        if menu_text:
-                            dish_position = find_dish_in_text(dish_name, menu_text)
-                            page_text = menu_text  # Use menu text for price extraction
-                
-                # Strategy 3: Try Playwright if static content is very short
-                if dish_position is None and (not page_text or len(page_text) < 500):
-                    logger.info(f"[DEBUG] Мало контента, пробуем браузер: {menu_url}")
-                    page_text = await menu_parser.get_menu_text(menu_url, use_browser=True)
-                    if page_text:
-                        dish_position = find_dish_in_text(dish_name, page_text)
-                
-                # Check if this is an image-based menu (very little extractable text even after browser)
-                is_image_based_menu = (not page_text or len(page_text) < 300)
-                
-                if dish_position is not None and page_text:
-                    # Dish found! Add and update message immediately
-                    price, _ = extract_price(page_text, dish_position)
-                    
-                    restaurants_with_dish.append({
-                        "name": restaurant.name,
-                        "website": website,
-                        "dish_name": dish_name,
-                        "price": price,
-                        "menu_url": menu_url
-                    })
-                    logger.info(f"[DEBUG] Найдено блюдо: {restaurant.name} -> {dish_name}, цена: {price}")
+            # Process only new restaurants (not checked before), concurrently
+            new_restaurants = [r for r in restaurants if r.id not in checked_ids]
+            checked_ids.update(r.id for r in new_restaurants)
+            
+            # Look up the whole batch's websites up front (more at once than the
+            # checks run): check_restaurant then finds them cached or in flight
+            prefetch = asyncio.create_task(site_finder.find_websites(new_restaurants))
+            tasks = [asyncio.create_task(check_restaurant_limited(r)) for r in new_restaurants]
+            
+            try:
+                # Handle results as they complete; stop early once enough are found
+                for next_done in asyncio.as_completed(tasks):
+                    result = await next_done
+                    if result is None:
+                        continue
                     
-                    # Update message immediately with new result
-                    if len(restaurants_with_dish) < target_count:
+                    if result["found"]:
+                        # Dish found! Add and update message immediately
+                        restaurants_with_dish.append(result)
+                        
+                        if len(restaurants_with_dish) >= target_count:
+                            break
+                        
                         status_text = format_found_restaurants(restaurants_with_dish, dish_name)
                         status_text += f"\n---\nИщу ещё... Радиус: {current_radius} м"
                         await processing_msg.edit_text(status_text, parse_mode="Markdown", disable_web_page_preview=True)
-                else:
-                    # Dish not found in menu - add to checked list with reason
-                    restaurants_checked.append({
-                        "name": restaurant.name,
-                        "website": website,
-                        "menu_url": menu_url,
-                        "found": False,
-                        "is_image_menu": is_image_based_menu
-                    })
-                    if is_image_based_menu:
-                        logger.info(f"[DEBUG] Меню в виде изображений: {restaurant.name} -> {website}")
                     else:
-                        logger.info(f"[DEBUG] Блюдо не найдено в меню: {restaurant.name}")
+                        # Dish not found in menu - add to checked list with reason
+                        restaurants_checked.append(result)
+            finally:
+                # Cancel remaining checks and lookups (target reached or search failed)
+                prefetch.cancel()
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(prefetch, *tasks, return_exceptions=True)
             
             # Stop if we found enough restaurants with the dish
             if len(restaurants_with_dish) >= target_count:
@@ -379,45 +414,102 @@ async def callback_new_search(callback: CallbackQuery, state: FSMContext):
 
 # --- Helper functions ---
 
-async def search_dish_in_restaurants(restaurants, dish_name: str) -> List[SearchResult]:
+async def _search_one_restaurant(restaurant, dish_name: str) -> SearchResult:
+    """Search for dish in one restaurant, never raising."""
+    try:
+        result = await dish_matcher.search_dish(restaurant, dish_name)
+    except Exception as e:
+        # Keep sibling searches running; report this one as unavailable
+        logger.error(f"Search task failed for {restaurant.name}: {e}")
+        return SearchResult(
+            restaurant=restaurant,
+            status=RestaurantStatus.MENU_UNAVAILABLE,
+            error_message=str(e),
+        )
+    
+    # Filter out invalid website sources (Telegram, VK, WhatsApp, etc.)
+    if result.menu_url:
+        invalid_domains = [
+            "t.me", "telegram.org", "vk.com", "whatsapp.com", 
+            "wa.me", "facebook.com", "instagram.com"
+        ]
+        if any(domain in result.menu_url.lower() for domain in invalid_domains):
+            # Mark as SITE_NOT_FOUND if it's not a proper website
+            result.status = RestaurantStatus.SITE_NOT_FOUND
+            result.menu_url = None
+    
+    return result
+
+
+async def iter_dish_search(
+    restaurants, dish_name: str, max_concurrent: int = 3
+) -> AsyncIterator[SearchResult]:
     """
-    Search for dish in multiple restaurants concurrently.
+    Search for dish in multiple restaurants, yielding results as they finish.
     
-    Limits concurrency to avoid overwhelming servers.
-    Only returns restaurants with valid websites (not Telegram/VK/WhatsApp).
+    Callers can act on early hits while the remaining searches are still
+    waiting on the network. A fixed pool of max_concurrent workers drains
+    the restaurant queue and pushes results onto an output queue, so no
+    more than max_concurrent searches (and tasks) exist at a time.
+    Workers still running when the consumer stops iterating are cancelled.
+    
+    Args:
+        restaurants: Restaurants to search
+        dish_name: Dish to look for
+        max_concurrent: Maximum number of searches in flight
+        
+    Yields:
+        SearchResult in completion order
     """
-    semaphore = asyncio.Semaphore(3)  # Max 3 concurrent requests
+    pending: asyncio.Queue = asyncio.Queue()
+    for restaurant in restaurants:
+        pending.put_nowait(restaurant)
+    total = pending.qsize()
     
-    async def search_one(restaurant):
-        async with semaphore:
-            result = await dish_matcher.search_dish(restaurant, dish_name)
-            
-            # Filter out invalid website sources (Telegram, VK, WhatsApp, etc.)
-            if result.menu_url:
-                invalid_domains = [
-                    "t.me", "telegram.org", "vk.com", "whatsapp.com", 
-                    "wa.me", "facebook.com", "instagram.com"
-                ]
-                if any(domain in result.menu_url.lower() for domain in invalid_domains):
-                    # Mark as SITE_NOT_FOUND if it's not a proper website
-                    result.status = RestaurantStatus.SITE_NOT_FOUND
-                    result.menu_url = None
+    done: asyncio.Queue = asyncio.Queue()
+    
+    async def worker():
+        while True:
+            try:
+                restaurant = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
             
-            return result
+            done.put_nowait(await _search_one_restaurant(restaurant, dish_name))
     
-    tasks = [search_one(r) for r in restaurants]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # Plain tasks rather than a TaskGroup: the TaskGroup block would have
+    # to stay open across yields to the consumer, which asyncio doesn't support
+    workers = [asyncio.create_task(worker()) for _ in range(min(max_concurrent, total))]
+    try:
+        for _ in range(total):
+            yield await done.get()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def search_dish_in_restaurants(restaurants, dish_name: str, max_concurrent: int = 3) -> List[SearchResult]:
+    """
+    Search for dish in multiple restaurants concurrently.
+    
+    Limits concurrency to avoid overwhelming servers.
+    Only returns restaurants with valid websites (not Telegram/VK/WhatsApp).
+    """
+    # Drop duplicate restaurants (same 2GIS id) before searching
+    restaurants = list(dict.fromkeys(restaurants))
+    order = {restaurant.id: index for index, restaurant in enumerate(restaurants)}
     
-    # Filter out exceptions and SITE_NOT_FOUND results
-    valid_results = []
-    for result in results:
-        if isinstance(result, SearchResult):
-            if result.status != RestaurantStatus.SITE_NOT_FOUND:
-                valid_results.append(result)
-        elif isinstance(result, Exception):
-            logger.error(f"Search task failed: {result}")
+    # Filter out SITE_NOT_FOUND results
+    results = [
+        result
+        async for result in iter_dish_search(restaurants, dish_name, max_concurrent)
+        if result.status != RestaurantStatus.SITE_NOT_FOUND
+    ]
     
-    return valid_results
+    # Restore input order
+    results.sort(key=lambda result: order.get(result.restaurant.id, len(order)))
+    return results
 
 
 def format_search_results(dish_name: str, location: str, results: List[SearchResult]) -> str:
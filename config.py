@@ -30,6 +30,12 @@ class Settings(BaseSettings):
     agent_timeout_seconds: int = Field(default=15, env="AGENT_TIMEOUT_SECONDS")
     agent_max_steps: int = Field(default=3, env="AGENT_MAX_STEPS")
     
+    # Playwright: connect to a long-lived Chromium over CDP instead of launching
+    # one per call (e.g. http://127.0.0.1:9222). Empty = launch locally.
+    browser_cdp_url: str = Field(default="", env="BROWSER_CDP_URL")
+    # Max browser contexts open at once (reused between page loads)
+    browser_contexts: int = Field(default=2, env="BROWSER_CONTEXTS")
+    
     # Groq API (free LLM)
     groq_api_key: str = Field(default="", env="GROQ_API_KEY")
     
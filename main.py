@@ -14,6 +14,7 @@ from aiogram.client.default import DefaultBotProperties
 
 from config import settings
 from bot import router
+from utils.browser import browser_manager
 from utils.http_client import http_client
 
 # Configure logging
@@ -39,6 +40,10 @@ async def on_startup(bot: Bot) -> None:
     # Get bot info
     bot_info = await bot.get_me()
     logger.info(f"Bot: @{bot_info.username} ({bot_info.first_name})")
+    
+    # Start Chromium ahead of the first agent run instead of on its critical path
+    if settings.agent_enabled:
+        browser_manager.start_warm_up()
 
 
 async def on_shutdown(bot: Bot) -> None:
@@ -48,6 +53,9 @@ async def on_shutdown(bot: Bot) -> None:
     # Close HTTP client session
     await http_client.close()
     
+    # Close shared Playwright browser (if it was started)
+    await browser_manager.close()
+    
     logger.info("Cleanup complete")
 
 
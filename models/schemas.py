@@ -26,6 +26,15 @@ class Restaurant(BaseModel):
     
     class Config:
         frozen = True
+    
+    def __eq__(self, other) -> bool:
+        # 2GIS id identifies the firm; other fields may differ between copies
+        if isinstance(other, Restaurant):
+            return self.id == other.id
+        return NotImplemented
+    
+    def __hash__(self) -> int:
+        return hash(self.id)
 
 
 class MenuItem(BaseModel):
@@ -10,7 +10,7 @@ import json
 import re
 from enum import Enum
 from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +42,21 @@ class AgentAction:
     reason: Optional[str] = None
 
 
+# Menu page indicators (URL fragments, then food categories and items in text)
+_URL_MENU_INDICATORS = ("/menu", "/food", "/dishes", "/kitchen", "/cuisine", "/kuhnya")
+_TEXT_MENU_INDICATORS = (
+    "меню", "блюд", "цена", "порция", "грамм",
+    "салат", "суп", "горячее", "десерт", "напитки",
+    "закуск", "роллы", "пицца", "паста", "стейк",
+    "₽", "руб", "menu", "dishes", "price",
+)
+
+# Markdown code fences the LLM sometimes wraps its JSON in
+_CODE_FENCE_RE = re.compile(r"```\w*\n?")
+
+# Link texts the no-LLM heuristic clicks (one case-insensitive pass per link)
+_HEURISTIC_MENU_LINK_RE = re.compile(r"меню|menu|блюда|dishes|кухня|food", re.IGNORECASE)
+
 # System prompt for LLM reasoning
 AGENT_SYSTEM_PROMPT = """You are a web navigation agent. Your task is to find the restaurant menu and check if a specific dish exists.
 
@@ -74,10 +89,6 @@ class MenuFinderAgent:
     Should only be used as a fallback when static parsing fails.
     """
     
-    def __init__(self):
-        self._browser = None
-        self._playwright = None
-        
     async def find_menu_and_dish(
         self,
         site_url: str,
@@ -132,30 +143,32 @@ class MenuFinderAgent:
                 dish_fragment=None,
                 status=AgentStatus.ERROR
             )
-        finally:
-            await self._cleanup()
     
     async def _run_agent(self, site_url: str, dish: str, max_steps: int) -> AgentResult:
-        """Run the agent loop."""
-        
-        # Initialize browser
-        page = await self._init_browser(site_url)
-        if not page:
-            return AgentResult(
-                found=False,
-                menu_url=None,
-                dish_fragment=None,
-                status=AgentStatus.ERROR
-            )
-        
-        current_url = site_url
+        """Run the agent in its own pooled browser context (runs can overlap)."""
+        from utils.browser import browser_manager
         
+        # Heavy resources and trackers are blocked on pooled contexts;
+        # the context goes back to the pool when the run ends or times out
+        async with browser_manager.context() as context:
+            page = await self._init_browser(context, site_url)
+            if not page:
+                return AgentResult(
+                    found=False,
+                    menu_url=None,
+                    dish_fragment=None,
+                    status=AgentStatus.ERROR
+                )
+            
+            return await self._agent_loop(page, dish, max_steps)
+    
+    async def _agent_loop(self, page, dish: str, max_steps: int) -> AgentResult:
+        """Run the agent loop on an opened page."""
         for step in range(max_steps):
             logger.info(f"[AGENT] Step {step + 1}/{max_steps}, URL: {page.url}")
             
-            # Get page context
-            page_text = await self._get_page_text(page)
-            links = await self._get_links(page)
+            # Get page context (text and links in one round-trip)
+            page_text, links = await self._get_page_snapshot(page)
             
             # Check if dish is already on page (quick win)
             if dish and self._dish_in_text(dish, page_text):
@@ -240,27 +253,11 @@ class MenuFinderAgent:
             status=AgentStatus.MENU_NOT_FOUND
         )
     
-    async def _init_browser(self, url: str):
-        """Initialize Playwright browser and navigate to URL."""
+    async def _init_browser(self, context, url: str):
+        """Open a page in the given browser context and navigate to URL."""
         try:
-            from playwright.async_api import async_playwright
-            
-            self._playwright = await async_playwright().start()
-            self._browser = await self._playwright.chromium.launch(
-                headless=True
-            )
-            
-            context = await self._browser.new_context(
-                viewport={'width': 1280, 'height': 720},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
-            
             page = await context.new_page()
             
-            # Block images and fonts for faster loading
-            await page.route("**/*.{png,jpg,jpeg,gif,webp,svg,ico,woff,woff2,ttf}", 
-                           lambda route: route.abort())
-            
             # Try loading with longer timeout, fall back to commit if slow
             try:
                 await page.goto(url, wait_until='domcontentloaded', timeout=20000)
@@ -274,19 +271,6 @@ class MenuFinderAgent:
             logger.error(f"[AGENT] Browser init error: {e}")
             return None
     
-    async def _cleanup(self):
-        """Clean up browser resources."""
-        try:
-            if self._browser:
-                await self._browser.close()
-            if self._playwright:
-                await self._playwright.stop()
-        except Exception as e:
-            logger.error(f"[AGENT] Cleanup error: {e}")
-        finally:
-            self._browser = None
-            self._playwright = None
-    
     async def _get_page_text(self, page) -> str:
         """Extract visible text from page."""
         try:
@@ -298,23 +282,24 @@ class MenuFinderAgent:
         except Exception:
             return ""
     
-    async def _get_links(self, page) -> List[Dict[str, str]]:
-        """Extract all links from page."""
+    async def _get_page_snapshot(self, page) -> Tuple[str, List[Dict[str, str]]]:
+        """Extract visible text and links from page in a single evaluate call."""
         try:
-            links = await page.evaluate('''() => {
+            snapshot = await page.evaluate('''() => {
+                const text = document.body.innerText || document.body.textContent || '';
                 const links = [];
                 document.querySelectorAll('a[href]').forEach(a => {
-                    const text = (a.innerText || a.textContent || '').trim();
+                    const linkText = (a.innerText || a.textContent || '').trim();
                     const href = a.href;
-                    if (text && text.length < 100 && href && !href.startsWith('javascript:')) {
-                        links.push({text: text, href: href});
+                    if (linkText && linkText.length < 100 && href && !href.startsWith('javascript:')) {
+                        links.push({text: linkText, href: href});
                     }
                 });
-                return links.slice(0, 30);  // Limit to 30 links
+                return {text: text.slice(0, 3000), links: links.slice(0, 30)};  // Limit for LLM context
             }''')
-            return links or []
+            return snapshot.get("text") or "", snapshot.get("links") or []
         except Exception:
-            return []
+            return "", []
     
     async def _click_link(self, page, link_text: str) -> bool:
         """Click a link by its text."""
@@ -371,24 +356,21 @@ class MenuFinderAgent:
     
     def _looks_like_menu(self, text: str, url: str = "") -> bool:
         """Check if text looks like a menu page."""
-        text_lower = text.lower()
         url_lower = url.lower() if url else ""
         
         # URL indicators
-        url_menu_indicators = ["/menu", "/food", "/dishes", "/kitchen", "/cuisine", "/kuhnya"]
-        if any(ind in url_lower for ind in url_menu_indicators):
+        if any(ind in url_lower for ind in _URL_MENU_INDICATORS):
             return True
         
-        # Text indicators - food categories and items
-        menu_indicators = [
-            "меню", "блюд", "цена", "порция", "грамм",
-            "салат", "суп", "горячее", "десерт", "напитки",
-            "закуск", "роллы", "пицца", "паста", "стейк",
-            "₽", "руб", "menu", "dishes", "price"
-        ]
-        
-        count = sum(1 for ind in menu_indicators if ind in text_lower)
-        return count >= 3
+        # Text indicators - food categories and items (stop at the threshold)
+        text_lower = text.lower()
+        count = 0
+        for ind in _TEXT_MENU_INDICATORS:
+            if ind in text_lower:
+                count += 1
+                if count >= 3:
+                    return True
+        return False
     
     async def _ask_llm(
         self,
@@ -405,7 +387,7 @@ class MenuFinderAgent:
             return self._heuristic_action(links)
         
         try:
-            import aiohttp
+            from utils.http_client import http_client
             
             # Format links for prompt
             links_text = "\n".join([f"- {l['text']}" for l in links[:20]])
@@ -421,31 +403,26 @@ Available links:
 
 What action should I take?"""
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {settings.groq_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "llama-3.1-8b-instant",
-                        "messages": [
-                            {"role": "system", "content": AGENT_SYSTEM_PROMPT},
-                            {"role": "user", "content": user_prompt}
-                        ],
-                        "temperature": 0.1,
-                        "max_tokens": 150
-                    },
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        content = data["choices"][0]["message"]["content"]
-                        return self._parse_llm_response(content)
-                    else:
-                        logger.warning(f"[AGENT] Groq API error: {resp.status}")
-                        return self._heuristic_action(links)
+            data = await http_client.post_json(
+                "https://api.groq.com/openai/v1/chat/completions",
+                payload={
+                    "model": "llama-3.1-8b-instant",
+                    "messages": [
+                        {"role": "system", "content": AGENT_SYSTEM_PROMPT},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    "temperature": 0.1,
+                    "max_tokens": 150
+                },
+                headers={"Authorization": f"Bearer {settings.groq_api_key}"},
+                timeout_seconds=10,
+            )
+            if data is None:
+                logger.warning("[AGENT] Groq API request failed")
+                return self._heuristic_action(links)
+            
+            content = data["choices"][0]["message"]["content"]
+            return self._parse_llm_response(content)
                         
         except Exception as e:
             logger.error(f"[AGENT] LLM error: {e}")
@@ -459,7 +436,7 @@ What action should I take?"""
             
             # Remove markdown code blocks if present
             if content.startswith("```"):
-                content = re.sub(r"```\w*\n?", "", content)
+                content = _CODE_FENCE_RE.sub("", content)
                 content = content.strip()
             
             data = json.loads(content)
@@ -476,17 +453,14 @@ What action should I take?"""
     
     def _heuristic_action(self, links: List[Dict[str, str]]) -> AgentAction:
         """Fallback heuristic when LLM is unavailable."""
-        menu_keywords = ["меню", "menu", "блюда", "dishes", "кухня", "food"]
-        
         for link in links:
-            text_lower = link["text"].lower()
-            for keyword in menu_keywords:
-                if keyword in text_lower:
-                    return AgentAction(
-                        action_type="CLICK",
-                        target=link["text"],
-                        reason=f"heuristic: contains '{keyword}'"
-                    )
+            match = _HEURISTIC_MENU_LINK_RE.search(link["text"])
+            if match:
+                return AgentAction(
+                    action_type="CLICK",
+                    target=link["text"],
+                    reason=f"heuristic: contains '{match.group(0).lower()}'"
+                )
         
         return AgentAction(action_type="GIVE_UP", reason="no menu link found")
 
@@ -2,15 +2,19 @@
 Dish matching service - searches for dishes in menu text and extracts prices.
 """
 import logging
-from typing import Optional
+import re
+from typing import List, Optional
 
 from models import MenuItem, SearchResult, Restaurant, RestaurantStatus
 from services.site_finder import site_finder
 from services.menu_parser import menu_parser
-from utils.text_utils import find_dish_in_text, extract_price, normalize_text
+from utils.text_utils import find_dishes_in_text, extract_price, normalize_text
 
 logger = logging.getLogger(__name__)
 
+# Up to 4 words without digits (dish name before its price/weight)
+_DISH_NAME_RE = re.compile(r"\s*([^\s\d]+(?:\s+[^\s\d]+){0,3})")
+
 
 class DishMatcher:
     """
@@ -34,33 +38,43 @@ class DishMatcher:
         Returns:
             SearchResult with status and menu item if found
         """
+        results = await self.search_dishes(restaurant, [dish_name])
+        return results[0]
+    
+    async def search_dishes(self, restaurant: Restaurant, dish_names: List[str]) -> List[SearchResult]:
+        """
+        Search for several dishes in a restaurant's menu.
+        
+        Website, menu page and menu text are loaded once and the
+        normalized menu text is shared by all dish lookups.
+        
+        Args:
+            restaurant: Restaurant to search in
+            dish_names: Names of dishes to find
+            
+        Returns:
+            One SearchResult per dish name, in the same order
+        """
         result = SearchResult(restaurant=restaurant)
         
-        # Step 1: Find restaurant website
+        # Step 1: Find restaurant website (cached per restaurant by site_finder)
         website = await site_finder.find_website(restaurant)
         
         if not website:
             result.status = RestaurantStatus.SITE_NOT_FOUND
             logger.info(f"No website for {restaurant.name}")
-            return result
+            return [result.model_copy() for _ in dish_names]
         
-        result.restaurant = Restaurant(
-            id=restaurant.id,
-            name=restaurant.name,
-            address=restaurant.address,
-            lat=restaurant.lat,
-            lon=restaurant.lon,
-            website=website,
-        )
+        result.restaurant = restaurant.model_copy(update={"website": website})
         
-        # Step 2: Find menu page
+        # Step 2: Find menu page (sites known to have no menu page are cached)
         menu_url = await menu_parser.find_menu_url(website)
         
         if not menu_url:
             result.status = RestaurantStatus.MENU_UNAVAILABLE
             result.error_message = "Страница меню не найдена"
             logger.info(f"No menu page for {restaurant.name}")
-            return result
+            return [result.model_copy() for _ in dish_names]
         
         result.menu_url = menu_url
         
@@ -71,10 +85,25 @@ class DishMatcher:
             result.status = RestaurantStatus.MENU_UNAVAILABLE
             result.error_message = "Не удалось загрузить меню"
             logger.info(f"Failed to load menu for {restaurant.name}")
-            return result
+            return [result.model_copy() for _ in dish_names]
+        
+        # Step 4: Search for all dishes in one normalized text
+        positions = find_dishes_in_text(dish_names, menu_text)
         
-        # Step 4: Search for dish in text
-        dish_position = find_dish_in_text(dish_name, menu_text)
+        return [
+            self._build_result(result.model_copy(), menu_text, dish_name, positions[dish_name])
+            for dish_name in dish_names
+        ]
+    
+    def _build_result(
+        self,
+        result: SearchResult,
+        menu_text: str,
+        dish_name: str,
+        dish_position: Optional[int],
+    ) -> SearchResult:
+        """Fill search result for one dish from its position in menu text."""
+        restaurant = result.restaurant
         
         if dish_position is None:
             result.status = RestaurantStatus.MENU_UNAVAILABLE
@@ -110,33 +139,15 @@ class DishMatcher:
         """
         Try to extract the actual dish name from menu text.
         
-        Falls back to search query if extraction fails.
+        Takes up to 4 words starting near the match, stopping at the first
+        word with digits (price, weight). Falls back to search query.
         """
-        try:
-            # Get context around match
-            start = max(0, position - 10)
-            end = min(len(text), position + 50)
-            context = text[start:end]
-            
-            # Look for capitalized phrase or phrase before price
-            # This is a simple heuristic
-            words = context.split()
-            
-            # Find words that look like a dish name (2-4 words)
-            if len(words) >= 2:
-                # Take first 2-4 words as dish name
-                dish_words = []
-                for word in words[:4]:
-                    # Stop at price-like patterns
-                    if any(c.isdigit() for c in word) and len(word) <= 4:
-                        break
-                    dish_words.append(word)
-                
-                if dish_words:
-                    return " ".join(dish_words)
-            
-        except Exception:
-            pass
+        start = max(0, position - 10)
+        end = min(len(text), position + 50)
+        
+        match = _DISH_NAME_RE.match(text, start, end)
+        if match:
+            return match.group(1)
         
         # Fallback to search query
         return search_query.title()
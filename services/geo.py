@@ -1,6 +1,7 @@
 """
 2GIS API integration for restaurant search and geocoding.
 """
+import asyncio
 import logging
 from typing import List, Optional, Tuple
 
@@ -97,24 +98,36 @@ class GeoService:
         max_results = limit or settings.max_restaurants_per_search
         
         restaurants = []
+        seen_ids = set()  # IDs already added (same firm appears in several rubrics)
         
-        # Search for each rubric type
-        for rubric_id in RESTAURANT_RUBRIC_IDS:
-            if len(restaurants) >= max_results:
-                break
-                
-            params = {
+        # Query all rubric types concurrently
+        params_list = [
+            {
                 "key": self.api_key,
                 "point": f"{lon},{lat}",
                 "radius": radius,
                 "rubric_id": rubric_id,
                 "fields": "items.point,items.address",
-                "page_size": min(10, max_results - len(restaurants)),  # Максимум 10 по требованиям API
+                "page_size": min(10, max_results),  # Максимум 10 по требованиям API
             }
+            for rubric_id in RESTAURANT_RUBRIC_IDS
+        ]
+        
+        logger.info(f"[DEBUG] Запрос к 2GIS: rubrics={RESTAURANT_RUBRIC_IDS}, point={lon},{lat}, radius={radius}")
+        
+        responses = await asyncio.gather(
+            *(http_client.get_json(TWOGIS_CATALOG_URL, params=params) for params in params_list),
+            return_exceptions=True,
+        )
+        
+        # Merge results in rubric order
+        for rubric_id, data in zip(RESTAURANT_RUBRIC_IDS, responses):
+            if len(restaurants) >= max_results:
+                break
             
-            logger.info(f"[DEBUG] Запрос к 2GIS: rubric={rubric_id}, point={params['point']}, radius={radius}")
-            
-            data = await http_client.get_json(TWOGIS_CATALOG_URL, params=params)
+            if isinstance(data, Exception):
+                logger.error(f"2GIS request failed for rubric_id={rubric_id}: {data}")
+                continue
             
             logger.info(f"[DEBUG] Ответ 2GIS: {data}")
             
@@ -130,8 +143,9 @@ class GeoService:
                 
                 # Skip duplicates
                 item_id = item.get("id", "")
-                if any(r.id == item_id for r in restaurants):
+                if item_id in seen_ids:
                     continue
+                seen_ids.add(item_id)
                 
                 # Extract restaurant data
                 point = item.get("point", {})
@@ -1,23 +1,91 @@
 """
 Menu page discovery and HTML parsing.
 """
+import asyncio
+import html as html_lib
 import logging
 import re
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 from urllib.parse import urljoin, urlparse
 
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 
+from utils.browser import browser_manager
+from utils.cache import SingleFlight, TTLCache
+from utils.html_parsing import parse_html
 from utils.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns (shared by static and browser text extraction)
+_FAST_TAG_RE = re.compile(
+    r"<(script|style|noscript|iframe)[^>]*>.*?</\1>|<!--.*?-->|<[^>]+>",
+    re.S | re.I,
+)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+# Compiled link queries (run in C, no per-node Python wrappers)
+_LINK_XPATH = etree.XPath("//a[@href]")
+_NAV_LINK_XPATH = etree.XPath("//nav//a[@href] | //header//a[@href] | //ul//a[@href]")
+# Visible text nodes: inline CSS/JS (and JSON-LD) is not page content
+_VISIBLE_TEXT_XPATH = etree.XPath(
+    "//text()[not(ancestor::script or ancestor::style or ancestor::noscript or ancestor::template)]"
+)
+
+# Small, mostly static pages are stripped with a regex instead of a DOM parse
+FAST_EXTRACT_MAX_HTML_SIZE = 50_000
+FAST_EXTRACT_MAX_SCRIPTS = 5
+
 # Keywords to identify menu pages
 MENU_KEYWORDS = [
     "menu", "меню", "carta", "dishes", "блюда",
     "food", "кухня", "еда", "kitchen", "ассортимент",
 ]
 
+# One alternation pass instead of a loop over MENU_KEYWORDS per link
+_MENU_KEYWORD_RE = re.compile(
+    "|".join(map(re.escape, sorted(MENU_KEYWORDS, key=len, reverse=True)))
+)
+
+# Words that suggest page content is a menu
+MENU_INDICATORS = (
+    "меню", "блюд", "цена", "порция", "грамм",
+    "салат", "суп", "горячее", "десерт", "напитки",
+    "₽", "руб", "рубл", "заказ", "доставка",
+    "breakfast", "lunch", "dinner", "appetizer",
+    "main course", "dessert", "beverage", "price",
+)
+
+# Indicators needed for a page to count as a menu (снизил порог с 5 до 3)
+MENU_INDICATORS_MIN_COUNT = 3
+
+# Indicators show up early on menu pages; only this much page text is scanned
+MENU_CHECK_MAX_CHARS = 32_768
+
+# Links to PDF files, with or without query string / fragment
+_PDF_URL_RE = re.compile(r"\.pdf(?:[?#]|$)", re.I)
+
+# Same-page anchors: "#menu", "/#menu"; nav links also accept a short path
+# before the fragment ("/ru#menu", '#' within the first 10 chars)
+_RELATIVE_ANCHOR_RE = re.compile(r"/?#")
+_NAV_ANCHOR_RE = re.compile(r"#|/[^#]{0,8}#")
+
+# Probed paths that answered but weren't a menu are not requested again for a while
+FAILED_PROBE_TTL_SECONDS = 3600
+FAILED_PROBE_MAX_ENTRIES = 4096
+
+# Sites confirmed to have no menu page are not searched again for 30 days
+NO_MENU_CACHE_TTL_SECONDS = 30 * 24 * 3600
+NO_MENU_CACHE_MAX_ENTRIES = 4096
+
+# Max simultaneous common-path requests to one site
+COMMON_PATH_PROBE_CONCURRENCY = 4
+
+# Extracted menu texts are kept in memory for repeated searches of a restaurant
+MENU_TEXT_CACHE_TTL_SECONDS = 300
+MENU_TEXT_CACHE_MAX_ENTRIES = 128
+
 # Common menu URL paths
 COMMON_MENU_PATHS = [
     "/",  # Главная страница может быть меню
@@ -39,13 +107,41 @@ COMMON_MENU_PATHS = [
 ]
 
 
+def _is_root_relative(href: str) -> bool:
+    """True for "/path" hrefs that resolve against the site root without dot segments."""
+    return href.startswith("/") and not href.startswith("//") and "/." not in href
+
+
+def _join_url(base_url: str, base_domain: str, href: str) -> str:
+    """urljoin with a shortcut for root-relative hrefs (most menu links)."""
+    # urljoin drops an empty trailing query/fragment, so leave those to it
+    if _is_root_relative(href) and href[-1] not in "#?":
+        return base_domain + href
+    return urljoin(base_url, href)
+
+
 class MenuParser:
     """Service for finding and parsing restaurant menu pages."""
     
+    def __init__(self):
+        # Concurrent lookups of the same site and dish share one search
+        self._searches = SingleFlight()
+        # (menu_url, use_browser) -> extracted text
+        self._text_cache = TTLCache(MENU_TEXT_CACHE_MAX_ENTRIES, MENU_TEXT_CACHE_TTL_SECONDS)
+        # Probe URLs of common paths that answered but were not a menu
+        self._failed_probes = TTLCache(FAILED_PROBE_MAX_ENTRIES, FAILED_PROBE_TTL_SECONDS)
+        # Site netlocs confirmed to have no menu page
+        self._no_menu_sites = TTLCache(NO_MENU_CACHE_MAX_ENTRIES, NO_MENU_CACHE_TTL_SECONDS)
+    
     async def find_menu_url(self, website_url: str, dish: str = "") -> Optional[str]:
         """
         Find menu page URL starting from restaurant's main website.
         
+        Concurrent calls for the same site and dish wait for the search
+        already in flight instead of fetching the site again. Sites where
+        every strategy got a real answer and none found a menu are
+        remembered for NO_MENU_CACHE_TTL_SECONDS; network failures are not.
+        
         Strategy (hybrid approach):
         1. Static parser: Load main page, check for menu
         2. Static parser: Search for menu links
@@ -59,37 +155,50 @@ class MenuParser:
         Returns:
             Menu page URL or None
         """
-        logger.debug(f"Finding menu for: {website_url}")
-        
         # Ensure URL has scheme
         if not website_url.startswith("http"):
             website_url = f"https://{website_url}"
         
+        if urlparse(website_url).netloc in self._no_menu_sites:
+            logger.info(f"No menu page for {website_url} (cached)")
+            return None
+        
+        return await self._searches.run(
+            (website_url, dish), lambda: self._find_menu_url(website_url, dish)
+        )
+    
+    async def _find_menu_url(self, website_url: str, dish: str) -> Optional[str]:
+        """Run the menu search strategies for one site (see find_menu_url)."""
+        logger.debug(f"Finding menu for: {website_url}")
+        
         # === STATIC PARSING (fast and cheap) ===
         
         # Load main page
         html = await http_client.get(website_url)
         if not html:
             logger.warning(f"Failed to load main page: {website_url}")
-            # Try agent as fallback
-            return await self._try_agent_fallback(website_url, dish)
+            # Try agent as fallback (no page loaded: never cached as "no menu")
+            menu_url, _ = await self._try_agent_fallback(website_url, dish)
+            return menu_url
         
+        # Whether the static strategies really checked the site (no errors)
+        static_conclusive = False
         try:
-            soup = BeautifulSoup(html, "lxml")
+            # Strategies 1-2 parse and scan the page: run them off the event loop
+            menu_url, main_is_menu = await asyncio.to_thread(self._analyze_main_page, html, website_url)
             
             # Strategy 1: Find links with menu keywords (including anchors like #menu)
-            menu_url = self._find_menu_link(soup, website_url)
             if menu_url:
                 logger.info(f"Found menu link: {menu_url}")
                 return menu_url
             
             # Strategy 2: Check if main page IS the menu (no specific menu link found)
-            if self._page_looks_like_menu(soup):
+            if main_is_menu:
                 logger.info(f"Main page appears to be menu: {website_url}")
                 return website_url
             
             # Strategy 3: Try common paths
-            menu_url = await self._try_common_paths(website_url)
+            menu_url, static_conclusive = await self._try_common_paths(website_url, checked_url=website_url)
             if menu_url:
                 logger.info(f"Found menu at common path: {menu_url}")
                 return menu_url
@@ -99,18 +208,27 @@ class MenuParser:
         
         # === AGENT FALLBACK (slow but smart) ===
         logger.info(f"Static parser failed, trying agent for: {website_url}")
-        return await self._try_agent_fallback(website_url, dish)
+        menu_url, agent_conclusive = await self._try_agent_fallback(website_url, dish)
+        if not menu_url and static_conclusive and agent_conclusive:
+            self._remember_no_menu(website_url)
+        return menu_url
     
-    async def _try_agent_fallback(self, website_url: str, dish: str = "") -> Optional[str]:
-        """Try browser-based agent as fallback."""
+    async def _try_agent_fallback(self, website_url: str, dish: str = "") -> Tuple[Optional[str], bool]:
+        """
+        Try browser-based agent as fallback.
+        
+        Returns:
+            (menu URL or None, whether a None result is a real "no menu"
+            rather than an agent timeout or error)
+        """
         from config import settings
         
         if not settings.agent_enabled:
             logger.info("Agent is disabled")
-            return None
+            return None, True
         
         try:
-            from services.agent_menu_finder import menu_finder_agent
+            from services.agent_menu_finder import AgentStatus, menu_finder_agent
             
             result = await menu_finder_agent.find_menu_and_dish(
                 site_url=website_url,
@@ -121,34 +239,55 @@ class MenuParser:
             
             if result.menu_url:
                 logger.info(f"[AGENT] Found menu: {result.menu_url}")
-                return result.menu_url
+                return result.menu_url, True
             else:
                 logger.info(f"[AGENT] No menu found, status: {result.status}")
-                return None
+                return None, result.status in (AgentStatus.NOT_FOUND, AgentStatus.MENU_NOT_FOUND)
                 
         except ImportError as e:
             logger.warning(f"Agent not available (playwright not installed?): {e}")
-            return None
+            return None, True
         except Exception as e:
             logger.error(f"Agent error: {e}")
-            return None
+            return None, False
+    
+    def _analyze_main_page(self, html: str, website_url: str) -> Tuple[Optional[str], bool]:
+        """
+        Parse main page and run the static strategies (CPU-bound, thread-safe).
+        
+        Returns:
+            (menu link URL or None, whether the page itself looks like a menu)
+        """
+        doc = parse_html(html)
+        
+        menu_url = self._find_menu_link(doc, website_url)
+        if menu_url:
+            return menu_url, False
+        
+        return None, self._page_looks_like_menu(doc)
     
-    def _find_menu_link(self, soup: BeautifulSoup, base_url: str) -> Optional[str]:
-        """Find menu link in page HTML."""
+    def _find_menu_link(self, doc: lxml.html.HtmlElement, base_url: str) -> Optional[str]:
+        """Find menu link in parsed page HTML."""
         
-        menu_links = []  # Collect all potential menu links
-        anchor_links = []  # Links with #menu anchors
+        # Insertion-ordered dicts used as sets: O(1) dedupe, first found wins
+        menu_links: Dict[str, None] = {}  # Collect all potential menu links
+        anchor_links: Dict[str, None] = {}  # Links with #menu anchors
         parsed_base = urlparse(base_url)
         base_domain = f"{parsed_base.scheme}://{parsed_base.netloc}"
         
+        # Read href and lowercased text once per link; every pass below reuses them
+        links = {
+            link: (link.get("href", ""), link.text_content().lower().strip())
+            for link in _LINK_XPATH(doc)
+        }
+        
         # Check all links
-        for link in soup.find_all("a", href=True):
-            href = link.get("href", "").strip()
+        for raw_href, text in links.values():
+            href = raw_href.strip()
             href_lower = href.lower()
-            text = link.get_text().lower().strip()
             
-            # Skip PDF files (not supported in MVP)
-            if href_lower.endswith(".pdf"):
+            # Skip PDF files (not supported in MVP), including "menu.pdf?v=2"
+            if _PDF_URL_RE.search(href):
                 continue
             
             # Fix malformed URLs like "/https://..." or "/http://..."
@@ -157,132 +296,214 @@ class MenuParser:
                 href_lower = href.lower()
             
             # Check if link text or URL contains menu keywords
-            for keyword in MENU_KEYWORDS:
-                if keyword in href_lower or keyword in text:
+            if _MENU_KEYWORD_RE.search(href_lower) or _MENU_KEYWORD_RE.search(text):
+                full_url = None
+                
+                # Split path/fragment; relative hrefs don't need urljoin/urlparse
+                if href.startswith("#"):
+                    path, fragment = "", href[1:]
+                elif _is_root_relative(href):
+                    path, _, fragment = href.partition("#")
+                    path = path.partition("?")[0]
+                else:
                     full_url = urljoin(base_url, href)
-                    
-                    # Detect anchor links: #menu, /#menu, or full URLs like site.com/#menu
-                    # These point to the same page, just a section
                     parsed_href = urlparse(full_url)
-                    is_same_page_anchor = (
-                        parsed_href.fragment and  # Has #something
-                        (not parsed_href.path or parsed_href.path == "/" or parsed_href.path == "")
-                    )
-                    
-                    # Also check relative anchors
-                    is_relative_anchor = (
-                        href.startswith("#") or 
-                        href.startswith("/#")
-                    )
-                    
-                    is_anchor = is_same_page_anchor or is_relative_anchor
-                    
-                    if is_anchor:
-                        anchor_url = f"{base_domain}/#{parsed_href.fragment}" if parsed_href.fragment else full_url
-                        if anchor_url not in anchor_links:
-                            anchor_links.append(anchor_url)
-                    else:
-                        if full_url not in menu_links:
-                            menu_links.append(full_url)
-                    break
+                    path, fragment = parsed_href.path, parsed_href.fragment
+                
+                # Detect anchor links: #menu, /#menu, or full URLs like site.com/#menu
+                # These point to the same page, just a section
+                is_same_page_anchor = (
+                    fragment and  # Has #something
+                    (not path or path == "/")
+                )
+                
+                # Also check relative anchors (#menu, /#menu)
+                is_relative_anchor = _RELATIVE_ANCHOR_RE.match(href) is not None
+                
+                is_anchor = is_same_page_anchor or is_relative_anchor
+                
+                if full_url is None and not (is_anchor and fragment):
+                    full_url = _join_url(base_url, base_domain, href)
+                
+                if is_anchor:
+                    anchor_url = f"{base_domain}/#{fragment}" if fragment else full_url
+                    anchor_links.setdefault(anchor_url)
+                else:
+                    menu_links.setdefault(full_url)
         
         # Also find "Открыть меню" style links (common on Tilda sites)
-        for link in soup.find_all("a", href=True):
-            text = link.get_text().lower().strip()
-            href = link.get("href", "")
-            
+        for href, text in links.values():
             if "открыть" in text and ("меню" in text or "menu" in href.lower()):
-                full_url = urljoin(base_url, href)
-                if full_url not in menu_links and not href.startswith("#"):
-                    menu_links.append(full_url)
+                full_url = _join_url(base_url, base_domain, href)
+                if not href.startswith("#"):
+                    menu_links.setdefault(full_url)
         
         # Check navigation menus specifically
-        nav_elements = soup.find_all(["nav", "header", "ul"])
-        for nav in nav_elements:
-            for link in nav.find_all("a", href=True):
-                text = link.get_text().lower()
-                href = link.get("href", "").strip()
-                
-                # Fix malformed URLs
-                if href.startswith("/https://") or href.startswith("/http://"):
-                    href = href[1:]
+        for link in _NAV_LINK_XPATH(doc):
+            raw_href, text = links[link]
+            href = raw_href.strip()
+            
+            # Fix malformed URLs
+            if href.startswith("/https://") or href.startswith("/http://"):
+                href = href[1:]
+            
+            if _MENU_KEYWORD_RE.search(text):
+                # Detect anchor links (#menu, /#menu, short paths like /ru/#menu)
+                is_anchor = _NAV_ANCHOR_RE.match(href) is not None
                 
-                for keyword in MENU_KEYWORDS:
-                    if keyword in text:
-                        # Detect anchor links
-                        is_anchor = (
-                            href.startswith("#") or 
-                            href.startswith("/#") or
-                            (href.startswith("/") and "#" in href and href.index("#") < 10)
-                        )
-                        
-                        if is_anchor:
-                            anchor = href.lstrip("/").rstrip("/")
-                            if not anchor.startswith("#"):
-                                anchor = "#" + anchor.split("#")[-1]
-                            full_url = f"{base_domain}/{anchor}"
-                            if full_url not in anchor_links:
-                                anchor_links.append(full_url)
-                        else:
-                            full_url = urljoin(base_url, href)
-                            if full_url not in menu_links:
-                                menu_links.append(full_url)
-                        break
+                if is_anchor:
+                    anchor = href.lstrip("/").rstrip("/")
+                    if not anchor.startswith("#"):
+                        anchor = "#" + anchor.split("#")[-1]
+                    full_url = f"{base_domain}/{anchor}"
+                    anchor_links.setdefault(full_url)
+                else:
+                    full_url = _join_url(base_url, base_domain, href)
+                    menu_links.setdefault(full_url)
         
         # Prefer real page links over anchor links
         if menu_links:
-            logger.debug(f"Found {len(menu_links)} menu page links: {menu_links[:3]}")
-            return menu_links[0]
+            found = list(menu_links)
+            logger.debug(f"Found {len(found)} menu page links: {found[:3]}")
+            return found[0]
         
         # Fall back to anchor links (like #menu) - return URL with anchor
         if anchor_links:
-            logger.debug(f"Found {len(anchor_links)} anchor links: {anchor_links[:3]}")
-            return anchor_links[0]
+            found = list(anchor_links)
+            logger.debug(f"Found {len(found)} anchor links: {found[:3]}")
+            return found[0]
         
         return None
     
-    def _page_looks_like_menu(self, soup: BeautifulSoup) -> bool:
-        """Check if page content looks like a menu."""
-        text = soup.get_text().lower()
-        
-        # Count menu-related keywords
-        menu_indicators = [
-            "меню", "блюд", "цена", "порция", "грамм",
-            "салат", "суп", "горячее", "десерт", "напитки",
-            "₽", "руб", "рубл", "заказ", "доставка",
-            "breakfast", "lunch", "dinner", "appetizer",
-            "main course", "dessert", "beverage", "price",
-        ]
-        
-        count = sum(1 for indicator in menu_indicators if indicator in text)
+    def _page_looks_like_menu(self, doc: lxml.html.HtmlElement) -> bool:
+        """Check if page content looks like a menu (first MENU_CHECK_MAX_CHARS of visible text)."""
+        parts = []
+        size = 0
+        for chunk in _VISIBLE_TEXT_XPATH(doc):
+            parts.append(chunk)
+            size += len(chunk)
+            if size >= MENU_CHECK_MAX_CHARS:
+                break
+        text = "".join(parts)[:MENU_CHECK_MAX_CHARS].lower()
         
         # If many menu indicators present, likely a menu page
-        logger.debug(f"Menu indicators count: {count}")
-        return count >= 3  # Снизил порог с 5 до 3
+        looks_like_menu = self._has_menu_indicators(text)
+        logger.debug(f"Menu indicators threshold reached: {looks_like_menu}")
+        return looks_like_menu
+    
+    @staticmethod
+    def _has_menu_indicators(text: str) -> bool:
+        """Check lowercased text for MENU_INDICATORS_MIN_COUNT indicators, stopping early."""
+        count = 0
+        for indicator in MENU_INDICATORS:
+            if indicator in text:
+                count += 1
+                if count >= MENU_INDICATORS_MIN_COUNT:
+                    return True
+        return False
+    
+    def _probe_looks_like_menu(self, html: str) -> bool:
+        """Menu check for a probed page: raw pre-check, then parse (CPU-bound)."""
+        return self._html_may_be_menu(html) and self._page_looks_like_menu(parse_html(html))
+    
+    def _html_may_be_menu(self, html: str) -> bool:
+        """
+        Cheap pre-check on raw HTML before building a DOM.
+        
+        Raw markup is checked first (false positives are fine, the DOM check
+        decides). Otherwise tags are removed and the text checked again, so
+        indicators split by inline markup ("ме<b>ню</b>") are still counted.
+        """
+        raw = html_lib.unescape(html).lower() if "&" in html else html.lower()
+        if self._has_menu_indicators(raw):
+            return True
+        
+        text = _TAG_RE.sub("", html)
+        text = html_lib.unescape(text).lower() if "&" in text else text.lower()
+        return self._has_menu_indicators(text)
     
-    async def _try_common_paths(self, base_url: str) -> Optional[str]:
-        """Try common menu URL paths."""
+    async def _try_common_paths(
+        self, base_url: str, checked_url: Optional[str] = None
+    ) -> Tuple[Optional[str], bool]:
+        """
+        Try common menu URL paths.
+        
+        Paths are requested concurrently (at most COMMON_PATH_PROBE_CONCURRENCY
+        at a time; the per-domain rate limiter still spaces the requests out),
+        but responses are checked in COMMON_MENU_PATHS order so earlier paths
+        keep priority. Paths that answered with something other than a menu
+        within FAILED_PROBE_TTL_SECONDS are not requested again; timeouts,
+        connection errors, 429 and 5xx are not remembered.
+        
+        Args:
+            base_url: Any URL on the restaurant site
+            checked_url: Page already loaded and rejected by the caller;
+                paths pointing to the same document ("/", "/#menu") are skipped
+        
+        Returns:
+            (menu URL or None, whether every path got a response
+            and was judged not a menu)
+        """
         parsed = urlparse(base_url)
         base = f"{parsed.scheme}://{parsed.netloc}"
         
-        for path in COMMON_MENU_PATHS:
-            url = f"{base}{path}"
-            
-            html = await http_client.get(url)
-            if html:
-                try:
-                    soup = BeautifulSoup(html, "lxml")
-                    if self._page_looks_like_menu(soup):
-                        return url
-                except Exception:
-                    pass
+        skip_page = self._page_key(checked_url) if checked_url else None
+        urls = [
+            url for url in (f"{base}{path}" for path in COMMON_MENU_PATHS)
+            if self._page_key(url) != skip_page and url not in self._failed_probes
+        ]
         
-        return None
+        # Don't keep more than a few requests open against one small site
+        semaphore = asyncio.Semaphore(COMMON_PATH_PROBE_CONCURRENCY)
+        
+        async def fetch(url: str) -> Tuple[Optional[int], Optional[str]]:
+            async with semaphore:
+                return await http_client.get_with_status(url)
+        
+        tasks = [asyncio.create_task(fetch(url)) for url in urls]
+        conclusive = True
+        
+        try:
+            for url, task in zip(urls, tasks):
+                status, html = await task
+                if html:
+                    try:
+                        if await asyncio.to_thread(self._probe_looks_like_menu, html):
+                            return url, True
+                    except Exception:
+                        pass
+                if status is None or status == 429 or status >= 500:
+                    # No real answer: may be a menu after all, ask again next time
+                    conclusive = False
+                else:
+                    self._failed_probes.set(url, True)
+        finally:
+            # Stop requests that are no longer needed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        return None, conclusive
+    
+    def _remember_no_menu(self, website_url: str) -> None:
+        """Add site to the no-menu cache."""
+        site = urlparse(website_url).netloc
+        self._no_menu_sites.set(site, True)
+        logger.info(f"Remembering {site} as having no menu page")
+    
+    @staticmethod
+    def _page_key(url: str) -> str:
+        """URL without fragment and trailing slash (same document => same key)."""
+        return url.partition("#")[0].rstrip("/")
     
     async def get_menu_text(self, menu_url: str, use_browser: bool = False) -> Optional[str]:
         """
         Load menu page and extract text content.
         
+        Results are cached in memory for MENU_TEXT_CACHE_TTL_SECONDS, so
+        searching several dishes in the same restaurant loads and parses
+        the page once.
+        
         Args:
             menu_url: URL of menu page
             use_browser: If True, use Playwright for JavaScript rendering
@@ -290,25 +511,51 @@ class MenuParser:
         Returns:
             Extracted text content or None
         """
+        key = (menu_url, use_browser)
+        text = self._text_cache.get(key)
+        if text is not None:
+            logger.debug(f"Menu text cache hit: {menu_url}")
+            return text
+        
         if use_browser:
-            return await self._get_menu_text_with_browser(menu_url)
+            text = await self._get_menu_text_with_browser(menu_url)
+        else:
+            html = await http_client.get(menu_url)
+            if not html:
+                return None
+            
+            # Parsing large pages blocks for tens of ms: keep it off the event loop
+            text = await asyncio.to_thread(self._extract_text, html)
         
-        html = await http_client.get(menu_url)
-        if not html:
-            return None
+        if text:
+            self._text_cache.set(key, text)
+        
+        return text
+    
+    def _extract_text(self, html: str) -> Optional[str]:
+        """
+        Extract visible text from page HTML.
+        
+        Shared by the static and browser paths; small pages skip the DOM.
+        """
+        if len(html) < FAST_EXTRACT_MAX_HTML_SIZE and html.count("<script") <= FAST_EXTRACT_MAX_SCRIPTS:
+            return self._extract_text_fast(html)
         
         try:
-            soup = BeautifulSoup(html, "lxml")
+            doc = parse_html(html)
             
-            # Remove script and style elements
-            for element in soup(["script", "style", "noscript", "iframe"]):
-                element.decompose()
+            # Remove script and style elements, keeping the text that follows them.
+            # The tail is merged into the preceding text: pad it so words stay apart.
+            for el in doc.iter("script", "style", "noscript", "iframe"):
+                if el.tail:
+                    el.tail = " " + el.tail
+            etree.strip_elements(doc, "script", "style", "noscript", "iframe", with_tail=False)
             
             # Get text
-            text = soup.get_text(separator=" ", strip=True)
+            text = " ".join(doc.itertext())
             
-            # Clean up whitespace
-            text = re.sub(r"\s+", " ", text)
+            # Clean up whitespace (str.split collapses runs without the regex engine)
+            text = " ".join(text.split())
             
             return text
             
@@ -316,6 +563,16 @@ class MenuParser:
             logger.error(f"Error extracting menu text: {e}")
             return None
     
+    def _extract_text_fast(self, html: str) -> str:
+        """
+        Extract text from small HTML without building a DOM.
+        
+        Drops script/style blocks and tags with a single regex pass.
+        """
+        text = _FAST_TAG_RE.sub(" ", html)
+        text = html_lib.unescape(text)
+        return " ".join(text.split())
+    
     async def _get_menu_text_with_browser(self, menu_url: str) -> Optional[str]:
         """
         Load menu page with Playwright (JavaScript rendering).
@@ -323,44 +580,30 @@ class MenuParser:
         Used for sites like Tilda that load content dynamically.
         """
         try:
-            from playwright.async_api import async_playwright
-            
             logger.info(f"[BROWSER] Loading {menu_url} with Playwright")
             
-            playwright = await async_playwright().start()
-            browser = await playwright.chromium.launch(headless=True)
-            
-            try:
-                context = await browser.new_context(
-                    viewport={'width': 1280, 'height': 720},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                )
+            async with browser_manager.context() as context:
+                # Heavy resources and trackers are blocked on the pooled context
                 page = await context.new_page()
                 
-                # Block images for faster loading
-                await page.route("**/*.{png,jpg,jpeg,gif,webp,svg,ico,woff,woff2,ttf}", 
-                               lambda route: route.abort())
+                await page.goto(menu_url, wait_until='load', timeout=30000)
                 
-                await page.goto(menu_url, wait_until='domcontentloaded', timeout=30000)
-                
-                # Wait for content to load
-                await page.wait_for_timeout(2000)
-                
-                # Get rendered text
-                text = await page.evaluate('''() => {
-                    return document.body.innerText || document.body.textContent || '';
-                }''')
+                # Wait until rendered content appears instead of a fixed sleep
+                try:
+                    await page.wait_for_function(
+                        "() => document.body && document.body.innerText.length > 500",
+                        timeout=3000,
+                    )
+                except Exception:
+                    pass  # Short pages are still worth extracting
                 
-                # Clean up whitespace
-                text = re.sub(r"\s+", " ", text) if text else None
+                # Get rendered HTML in one call and extract text locally
+                html = await page.content()
+                text = await asyncio.to_thread(self._extract_text, html) if html else None
                 
                 logger.info(f"[BROWSER] Extracted {len(text) if text else 0} chars")
                 return text
                 
-            finally:
-                await browser.close()
-                await playwright.stop()
-                
         except ImportError:
             logger.warning("[BROWSER] Playwright not installed")
             return None
@@ -1,15 +1,22 @@
 """
 Restaurant website finder using 2GIS web pages and Yandex search (fallback).
 """
+import asyncio
+import html as html_lib
 import logging
 import re
-from typing import Optional
-from urllib.parse import quote_plus, urljoin
+import socket
+from functools import lru_cache
+from typing import FrozenSet, List, Optional
+from urllib.parse import quote_plus, urljoin, urlsplit
 
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 
 from config import settings
 from models import Restaurant
+from utils.cache import SingleFlight, TTLCache
+from utils.html_parsing import parse_html
 from utils.http_client import http_client
 
 logger = logging.getLogger(__name__)
@@ -17,22 +24,238 @@ logger = logging.getLogger(__name__)
 # 2GIS web URL template
 TWOGIS_FIRM_URL = "https://2gis.ru/moscow/firm/{firm_id}"
 
+# Firm pages rarely change: keep them in the HTTP response cache for 6 hours
+TWOGIS_PAGE_CACHE_TTL_SECONDS = 6 * 3600
+
 # Yandex search URL (HTML version)
 YANDEX_SEARCH_URL = "https://yandex.ru/search/"
 
+# Markup around visible text: script/style/template blocks, comments, tags
+_NON_TEXT_RE = re.compile(
+    r"<(script|style|template)\b[^>]*>.*?</\1\s*>|<!--.*?-->|<[^>]+>",
+    re.S | re.I,
+)
+
+
+# Websites found per restaurant are remembered for a week; "none" only for an
+# hour, since it may come from a timeout or a 2GIS error page
+WEBSITE_CACHE_TTL_SECONDS = 7 * 24 * 3600
+WEBSITE_NOT_FOUND_CACHE_TTL_SECONDS = 3600
+_NOT_CACHED = object()
+WEBSITE_CACHE_MAX_ENTRIES = 4096
+
+# Restaurants looked up at once by find_websites (2GIS pages share one
+# host: the HTTP connector keeps at most 10 connections to it anyway)
+WEBSITE_SEARCH_CONCURRENCY = 10
+
+# Guessed hosts that did not resolve are not looked up again for an hour
+UNRESOLVED_HOST_TTL_SECONDS = 3600
+UNRESOLVED_HOST_MAX_ENTRIES = 4096
+
+# Precompiled link queries (evaluated by libxml2, not per element in Python)
+_UPPER = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_LOWER = "abcdefghijklmnopqrstuvwxyz"
+_WEBSITE_CLASS_COND = (
+    f"contains(translate(@class, '{_UPPER}', '{_LOWER}'), 'site')"
+    f" or contains(translate(@class, '{_UPPER}', '{_LOWER}'), 'url')"
+)
+_EXTERNAL_HREF_COND = (
+    f"starts-with(translate(substring(@href, 1, 8), '{_UPPER}', '{_LOWER}'), 'http://')"
+    f" or starts-with(translate(substring(@href, 1, 8), '{_UPPER}', '{_LOWER}'), 'https://')"
+)
+# Candidate website links in one pass: "website"/"site"/"url" in class
+# (case-insensitive) or absolute http(s) href
+_WEBSITE_LINK_XPATH = etree.XPath(f"//a[{_WEBSITE_CLASS_COND} or {_EXTERNAL_HREF_COND}]")
+_YANDEX_RESULT_LINK_XPATH = etree.XPath(
+    "//a[starts-with(@href, 'http://') or starts-with(@href, 'https://')]"
+)
+
+# Precompiled patterns for website link discovery
+# Target of a 2GIS tracking link anywhere in the raw page, including the
+# embedded page state JSON where slashes may be escaped as "\/" (stops at
+# quotes, whitespace, tags and other JSON escapes)
+_TRACKED_URL_RE = re.compile(
+    r"https?:(?:\\?/){2}link\.2gis\.(?:ru|com)\\?/(?:[^\s\"'<>\\?]|\\/)*"
+    r"\?(https?:(?:\\?/){2}(?:[^\s\"'<>\\]|\\/)+)",
+    re.I,
+)
+_SITE_TEXT_RE = re.compile(r"[Сс]айт[:\s]+([a-zA-Z0-9][a-zA-Z0-9\-\.]+\.[a-zA-Z]{2,})")
+
+# Known non-restaurant domains (matched against the URL host and its parent domains)
+EXCLUDED_DOMAINS = frozenset({
+    "2gis.ru",
+    "yandex.ru",
+    "google.com",
+    "vk.com",
+    "facebook.com",
+    "instagram.com",
+    "twitter.com",
+    "youtube.com",
+    "wikipedia.org",
+    "tripadvisor.ru",
+    "afisha.ru",
+    "restoclub.ru",
+    "zoon.ru",
+    "delivery-club.ru",
+    "eda.yandex.ru",
+    # Messengers (not real websites)
+    "wa.me",
+    "whatsapp.com",
+    "t.me",
+    "telegram.org",
+})
+
+# Russian to Latin transliteration for URL matching
+_TRANSLIT_TABLE = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d",
+    "е": "e", "ё": "e", "ж": "zh", "з": "z", "и": "i",
+    "й": "y", "к": "k", "л": "l", "м": "m", "н": "n",
+    "о": "o", "п": "p", "р": "r", "с": "s", "т": "t",
+    "у": "u", "ф": "f", "х": "h", "ц": "ts", "ч": "ch",
+    "ш": "sh", "щ": "sch", "ъ": "", "ы": "y", "ь": "",
+    "э": "e", "ю": "yu", "я": "ya",
+})
+
+
+@lru_cache(maxsize=4096)
+def _simple_translit(text: str) -> str:
+    """Simple Russian to Latin transliteration for URL matching (cached per word)."""
+    return text.lower().translate(_TRANSLIT_TABLE)
+
+
+@lru_cache(maxsize=1024)
+def _build_name_matchers(restaurant_name: str) -> FrozenSet[str]:
+    """
+    Words to look for in a restaurant website URL.
+    
+    Significant words of the name (3+ chars, letters only), as written
+    and transliterated. Built once per name instead of once per link.
+    """
+    matchers = set()
+    for word in restaurant_name.split():
+        # Clean word - keep only letters
+        clean_word = "".join(c for c in word.lower() if c.isalpha())
+        if len(clean_word) >= 3:
+            matchers.add(clean_word)
+            matchers.add(_simple_translit(clean_word))
+    
+    # A word of only hard/soft signs transliterates to "" (would match any URL)
+    matchers.discard("")
+    return frozenset(matchers)
+
+
+def _has_website_class(link: lxml.html.HtmlElement) -> bool:
+    """Check for "website"/"site"/"url" in link class (same test as _WEBSITE_CLASS_COND)."""
+    link_class = link.get("class", "").lower()
+    return "site" in link_class or "url" in link_class
+
+
+def _extract_real_url(url: str) -> Optional[str]:
+    """
+    Extract real URL from 2GIS tracking links.
+    
+    2GIS wraps external links in tracking: http://link.2gis.ru/...?http://real-site.ru/
+    """
+    if not url:
+        return None
+    
+    # Check if it's a 2GIS tracking link
+    if "link.2gis.ru" in url or "link.2gis.com" in url:
+        # Extract real URL from query string
+        # It's usually after the last '?' as: ...?http://real-url
+        _, sep, real_part = url.rpartition("?")
+        if sep and real_part.startswith("http"):
+            return real_part
+        return None
+    
+    # Not a tracking link, return as-is
+    return url
+
+
+def _is_valid_website(url: str) -> bool:
+    """Check if URL is a valid restaurant website."""
+    if not url or not url.startswith("http"):
+        return False
+    
+    try:
+        host = (urlsplit(url).hostname or "").rstrip(".")
+    except ValueError:
+        return False
+    
+    # "www.instagram.com" -> "www.instagram.com", "instagram.com"
+    labels = host.split(".")
+    return not any(".".join(labels[i:]) in EXCLUDED_DOMAINS for i in range(len(labels) - 1))
+
+
+def _is_likely_restaurant_site(url: str, name_matchers: FrozenSet[str]) -> bool:
+    """
+    Check if URL is likely the official restaurant website.
+    
+    Heuristic: domain OR path must contain at least one word from restaurant name.
+    This prevents returning unrelated sites from ads/recommendations.
+    
+    Args:
+        url: Candidate website URL
+        name_matchers: Restaurant name words, from _build_name_matchers
+    """
+    parsed = urlsplit(url)
+    # Check both domain and path (e.g., mavlyutov-rg.ru/muu)
+    url_to_check = (parsed.netloc + parsed.path).lower()
+    
+    if any(matcher in url_to_check for matcher in name_matchers):
+        return True
+    
+    # No match found - reject this URL (will trigger fallback)
+    logger.debug(f"Rejecting {url} - URL doesn't match restaurant name")
+    return False
+
+
+def _find_tracked_website(html: str, name_matchers: FrozenSet[str]) -> Optional[str]:
+    """
+    Find restaurant website among 2GIS tracking link targets in raw page HTML.
+    
+    2GIS wraps contact links as http://link.2gis.ru/...?http://real-site.ru/
+    both in rendered markup and in the page state data, so one regex
+    over the page finds them without parsing it.
+    """
+    seen_urls = set()
+    for match in _TRACKED_URL_RE.finditer(html):
+        # Undo JSON slash escapes and HTML entities ("&amp;" in attributes)
+        real_url = html_lib.unescape(match.group(1).replace("\\/", "/"))
+        if real_url in seen_urls:
+            continue
+        seen_urls.add(real_url)
+        
+        if _is_valid_website(real_url) and _is_likely_restaurant_site(real_url, name_matchers):
+            return real_url
+    
+    return None
+
 
 class SiteFinder:
     """
     Service for finding restaurant websites.
     
     Primary source: 2GIS web pages (parsing HTML)
-    Fallback: Yandex search (if enabled in config)
+    Fallbacks: URL guessed from the name, Yandex search (if enabled in config)
     """
     
+    def __init__(self):
+        # Restaurant ID -> website or None
+        self._cache = TTLCache(WEBSITE_CACHE_MAX_ENTRIES, WEBSITE_CACHE_TTL_SECONDS)
+        # Concurrent lookups of the same restaurant share one search
+        self._searches = SingleFlight()
+        # Guessed hosts that do not resolve
+        self._unresolved_hosts = TTLCache(UNRESOLVED_HOST_MAX_ENTRIES, UNRESOLVED_HOST_TTL_SECONDS)
+    
     async def find_website(self, restaurant: Restaurant) -> Optional[str]:
         """
         Find official website for a restaurant.
         
+        Results are cached per restaurant ID for WEBSITE_CACHE_TTL_SECONDS
+        (misses for WEBSITE_NOT_FOUND_CACHE_TTL_SECONDS), and concurrent
+        calls for the same restaurant share one lookup.
+        
         Strategy:
         1. Try 2GIS web page for the restaurant
         2. Try guessing URL from restaurant name
@@ -44,14 +267,76 @@ class SiteFinder:
         Returns:
             Website URL or None
         """
-        # Strategy 1: 2GIS web page (already checks name match)
-        website = await self._find_on_2gis(restaurant)
-        if website:
-            logger.info(f"Found website via 2GIS: {website}")
+        key = restaurant.id
+        website = self._cache.get(key, _NOT_CACHED)
+        if website is not _NOT_CACHED:
             return website
         
-        # Strategy 2: Yandex search (fallback, if enabled)
-        # NOTE: _guess_website_url disabled - too slow (40s+ per restaurant with failed guesses)
+        website = await self._searches.run(key, lambda: self._find_website(restaurant))
+        
+        ttl = WEBSITE_CACHE_TTL_SECONDS if website else WEBSITE_NOT_FOUND_CACHE_TTL_SECONDS
+        self._cache.set(key, website, ttl)
+        return website
+    
+    async def find_websites(
+        self,
+        restaurants: List[Restaurant],
+        concurrency: int = WEBSITE_SEARCH_CONCURRENCY,
+    ) -> List[Optional[str]]:
+        """
+        Find websites for several restaurants concurrently.
+        
+        Lookups share the HTTP session (keep-alive connections to 2GIS)
+        and the per-restaurant cache of find_website.
+        
+        Args:
+            restaurants: Restaurants to look up
+            concurrency: Max lookups in progress at once
+            
+        Returns:
+            Website URL or None for each restaurant, in the same order
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def find_limited(restaurant: Restaurant) -> Optional[str]:
+            async with semaphore:
+                try:
+                    return await self.find_website(restaurant)
+                except Exception as e:
+                    logger.error(f"Website search failed for {restaurant.name}: {e}")
+                    return None
+        
+        return await asyncio.gather(*(find_limited(r) for r in restaurants))
+    
+    async def _find_website(self, restaurant: Restaurant) -> Optional[str]:
+        """Run the website search strategies for one restaurant (see find_website)."""
+        # Strategy 2 starts right away: its DNS lookups and probes overlap the
+        # 2GIS request, and it is cancelled if 2GIS finds the site. Guessing
+        # used to be disabled as too slow (40s+ per restaurant, guesses
+        # fetched one by one with retries); now unresolvable hosts are
+        # skipped and the remaining guesses are fetched concurrently.
+        guess_task = asyncio.create_task(self._guess_website_url(restaurant))
+        try:
+            # Strategy 1: 2GIS web page (already checks name match)
+            website = await self._find_on_2gis(restaurant)
+            if website:
+                logger.info(f"Found website via 2GIS: {website}")
+                return website
+            
+            # Strategy 2: Guess URL from restaurant name
+            try:
+                website = await guess_task
+            except Exception as e:
+                logger.error(f"Website guess failed for {restaurant.name}: {e}")
+                website = None
+            if website:
+                logger.info(f"Found website by guessing: {website}")
+                return website
+        finally:
+            guess_task.cancel()
+            await asyncio.gather(guess_task, return_exceptions=True)
+        
+        # Strategy 3: Yandex search (fallback, if enabled)
         if settings.enable_yandex_search:
             website = await self._find_via_yandex(restaurant)
             if website:
@@ -72,39 +357,57 @@ class SiteFinder:
         
         logger.debug(f"Fetching 2GIS page: {url}")
         
-        html = await http_client.get(url)
+        html = await http_client.get(url, cache_ttl=TWOGIS_PAGE_CACHE_TTL_SECONDS)
         if not html:
             return None
         
+        name_matchers = _build_name_matchers(restaurant.name)
+        
+        # Fast path: the firm's contacts are embedded in the page as data,
+        # so the website is usually found without building a DOM
+        website = _find_tracked_website(html, name_matchers)
+        if website:
+            return website
+        
         try:
-            soup = BeautifulSoup(html, "lxml")
+            doc = parse_html(html)
             
-            # Collect all potential website links
-            all_links = []
+            # Collect all potential website links: links with specific class
+            # first (pattern 1), then other external http links (pattern 2)
+            all_links = _WEBSITE_LINK_XPATH(doc)
+            all_links.sort(key=lambda link: not _has_website_class(link))
             
-            # Pattern 1: Links with specific class
-            all_links.extend(soup.find_all("a", class_=re.compile(r"website|site|url", re.I)))
-            # Pattern 2: All external http links (not 2gis internal)
-            all_links.extend(soup.find_all("a", href=re.compile(r"^https?://", re.I)))
+            seen_hrefs = set()
             
             # Check each link - return first that matches restaurant name
             for link in all_links:
                 href = link.get("href", "")
                 
+                # The same URL often appears in several places on the page
+                if href in seen_hrefs:
+                    continue
+                seen_hrefs.add(href)
+                
+                # Most links are 2GIS's own pages: drop them before any URL parsing
+                href_head = href[:32]
+                if "2gis." in href_head and "link.2gis." not in href_head:
+                    continue
+                
                 # Extract real URL from 2GIS tracking links
                 # Format: http://link.2gis.ru/...?http://real-url.ru/path
-                real_url = self._extract_real_url(href)
+                real_url = _extract_real_url(href)
                 
-                if real_url and self._is_valid_website(real_url) and self._is_likely_restaurant_site(real_url, restaurant.name):
+                if real_url and _is_valid_website(real_url) and _is_likely_restaurant_site(real_url, name_matchers):
                     return real_url
             
             # Pattern 3: Look for text "Сайт:" followed by URL
-            text = soup.get_text()
-            site_match = re.search(r"[Сс]айт[:\s]+([a-zA-Z0-9][a-zA-Z0-9\-\.]+\.[a-zA-Z]{2,})", text)
+            # (regex over the page with markup removed, no tree walk)
+            text = html_lib.unescape(_NON_TEXT_RE.sub("", html))
+            site_match = _SITE_TEXT_RE.search(text)
             if site_match:
                 domain = site_match.group(1)
                 url = f"https://{domain}"
-                if self._is_likely_restaurant_site(url, restaurant.name):
+                if _is_likely_restaurant_site(url, name_matchers):
                     return url
             
         except Exception as e:
@@ -112,30 +415,6 @@ class SiteFinder:
         
         return None
     
-    def _extract_real_url(self, url: str) -> Optional[str]:
-        """
-        Extract real URL from 2GIS tracking links.
-        
-        2GIS wraps external links in tracking: http://link.2gis.ru/...?http://real-site.ru/
-        """
-        if not url:
-            return None
-        
-        # Check if it's a 2GIS tracking link
-        if "link.2gis.ru" in url or "link.2gis.com" in url:
-            # Extract real URL from query string
-            # It's usually after the last '?' as: ...?http://real-url
-            parts = url.split("?")
-            if len(parts) > 1:
-                # Get the last part which should contain the real URL
-                real_part = parts[-1]
-                if real_part.startswith("http"):
-                    return real_part
-            return None
-        
-        # Not a tracking link, return as-is
-        return url
-    
     async def _find_via_yandex(self, restaurant: Restaurant) -> Optional[str]:
         """
         Search for restaurant website using Yandex HTML search.
@@ -152,23 +431,27 @@ class SiteFinder:
         
         logger.debug(f"Yandex search: {query}")
         
-        # Rate limiting is handled by http_client
-        html = await http_client.get(YANDEX_SEARCH_URL, params=params)
+        # Rate limiting is handled by http_client; results are query-sensitive, not cached
+        html = await http_client.get(YANDEX_SEARCH_URL, params=params, cache_ttl=0)
         if not html:
             return None
         
         try:
-            soup = BeautifulSoup(html, "lxml")
+            doc = parse_html(html)
             
             # Find search result links
             # Yandex organic results typically have specific classes
-            result_links = soup.find_all("a", href=re.compile(r"^https?://"))
+            result_links = _YANDEX_RESULT_LINK_XPATH(doc)
+            
+            name_matchers = _build_name_matchers(restaurant.name)
             
             for link in result_links[:10]:  # Check first 10 links
                 href = link.get("href", "")
                 
                 # Skip Yandex internal links and known aggregators
-                if self._is_valid_website(href) and self._is_likely_restaurant_site(href, restaurant.name):
+                if href.startswith(("https://yandex.", "http://yandex.")):
+                    continue
+                if _is_valid_website(href) and _is_likely_restaurant_site(href, name_matchers):
                     return href
             
         except Exception as e:
@@ -209,7 +492,7 @@ class SiteFinder:
         if len(brand) < 3:
             return None
         
-        brand_translit = self._simple_translit(brand)
+        brand_translit = _simple_translit(brand)
         
         # Try common URL patterns
         url_patterns = [
@@ -219,103 +502,45 @@ class SiteFinder:
             f"https://{brand_translit}moscow.ru/",
         ]
         
-        for url in url_patterns:
-            # Quick check if site exists
-            try:
-                html = await http_client.get(url, max_retries=1)
+        # Most guessed domains don't exist: a DNS lookup rules them out without HTTP
+        resolved = await asyncio.gather(*(self._resolves(urlsplit(url).hostname) for url in url_patterns))
+        url_patterns = [url for url, ok in zip(url_patterns, resolved) if ok]
+        
+        # Guesses are different hosts: check them all at once, first pattern wins.
+        # One GET per guess: the body is needed anyway to tell a real site
+        # from a parked domain that also answers 200.
+        tasks = [asyncio.create_task(http_client.get(url, max_retries=1)) for url in url_patterns]
+        
+        try:
+            for url, task in zip(url_patterns, tasks):
+                try:
+                    html = await task
+                except Exception:
+                    continue
                 if html and len(html) > 500:
                     # Site exists and has content
                     logger.debug(f"Guessed website exists: {url}")
                     return url
-            except Exception:
-                continue
+        finally:
+            # Stop requests that are no longer needed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
         
         return None
     
-    def _is_valid_website(self, url: str) -> bool:
-        """Check if URL is a valid restaurant website."""
-        if not url or not url.startswith("http"):
+    async def _resolves(self, host: str) -> bool:
+        """Check that host has a DNS record (misses are cached for UNRESOLVED_HOST_TTL_SECONDS)."""
+        if host in self._unresolved_hosts:
             return False
         
-        # Exclude known non-restaurant domains
-        excluded_domains = [
-            "2gis.ru",
-            "yandex.ru",
-            "google.com",
-            "vk.com",
-            "facebook.com",
-            "instagram.com",
-            "twitter.com",
-            "youtube.com",
-            "wikipedia.org",
-            "tripadvisor.ru",
-            "afisha.ru",
-            "restoclub.ru",
-            "zoon.ru",
-            "delivery-club.ru",
-            "eda.yandex.ru",
-            # Messengers (not real websites)
-            "wa.me",
-            "whatsapp.com",
-            "t.me",
-            "telegram.org",
-        ]
-        
-        url_lower = url.lower()
-        return not any(domain in url_lower for domain in excluded_domains)
-    
-    def _is_likely_restaurant_site(self, url: str, restaurant_name: str) -> bool:
-        """
-        Check if URL is likely the official restaurant website.
-        
-        Heuristic: domain OR path must contain at least one word from restaurant name.
-        This prevents returning unrelated sites from ads/recommendations.
-        """
-        from urllib.parse import urlparse
-        
-        parsed = urlparse(url)
-        # Check both domain and path (e.g., mavlyutov-rg.ru/muu)
-        url_to_check = (parsed.netloc + parsed.path).lower()
-        
-        # Extract significant words from restaurant name (3+ chars, letters only)
-        name_words = []
-        for word in restaurant_name.split():
-            # Clean word - keep only letters
-            clean_word = ''.join(c for c in word.lower() if c.isalpha())
-            if len(clean_word) >= 3:
-                name_words.append(clean_word)
-        
-        # Check if any word appears in domain+path
-        for word in name_words:
-            # Check Russian word directly
-            if word in url_to_check:
-                return True
-            # Transliterate and check
-            word_translit = self._simple_translit(word)
-            if word_translit in url_to_check:
-                return True
-        
-        # No match found - reject this URL (will trigger fallback)
-        logger.debug(f"Rejecting {url} - URL doesn't match restaurant '{restaurant_name}'")
-        return False
-    
-    def _simple_translit(self, text: str) -> str:
-        """Simple Russian to Latin transliteration for URL matching."""
-        translit_map = {
-            "а": "a", "б": "b", "в": "v", "г": "g", "д": "d",
-            "е": "e", "ё": "e", "ж": "zh", "з": "z", "и": "i",
-            "й": "y", "к": "k", "л": "l", "м": "m", "н": "n",
-            "о": "o", "п": "p", "р": "r", "с": "s", "т": "t",
-            "у": "u", "ф": "f", "х": "h", "ц": "ts", "ч": "ch",
-            "ш": "sh", "щ": "sch", "ъ": "", "ы": "y", "ь": "",
-            "э": "e", "ю": "yu", "я": "ya",
-        }
-        
-        result = []
-        for char in text.lower():
-            result.append(translit_map.get(char, char))
-        
-        return "".join(result)
+        try:
+            await asyncio.get_running_loop().getaddrinfo(host, 443, type=socket.SOCK_STREAM)
+            return True
+        except (OSError, UnicodeError):
+            # gaierror is an OSError; IDNA encoding of a label over 63 chars raises UnicodeError
+            self._unresolved_hosts.set(host, True)
+            return False
 
 
 # Global service instance
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Offline checks for menu page detection (no network).
+
+Run directly or with pytest.
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def test_menu_below_large_inline_css_js():
+    """Big inline CSS/JS in <head> (Tilda, WordPress) must not hide the menu in <body>."""
+    from services.menu_parser import menu_parser
+    from utils.html_parsing import parse_html
+
+    css = "<style>" + ".t-rec{color:#000}\n" * 3000 + "</style>"  # ~48 KB
+    js = "<script>" + "var t=window.t||{};\n" * 1000 + "</script>"  # ~20 KB
+    body = (
+        "<body><h1>Меню</h1>"
+        "<p>Борщ — 450 ₽</p><p>Салат Цезарь, цена 520 руб</p><p>Десерт дня</p>"
+        "</body>"
+    )
+    html = f"<html><head>{css}{js}</head>{body}</html>"
+
+    assert menu_parser._page_looks_like_menu(parse_html(html))
+    assert menu_parser._probe_looks_like_menu(html)
+
+
+def test_script_keywords_are_not_menu_text():
+    """Menu words inside bundled JS or JSON-LD don't make a page a menu."""
+    from services.menu_parser import menu_parser
+    from utils.html_parsing import parse_html
+
+    html = (
+        "<html><head>"
+        "<script>var labels={price:'Цена',delivery:'доставка',order:'заказ'};</script>"
+        '<script type="application/ld+json">{"priceRange": "₽₽"}</script>'
+        "</head><body><h1>О ресторане</h1><p>Мы работаем с 2010 года.</p></body></html>"
+    )
+
+    assert not menu_parser._page_looks_like_menu(parse_html(html))
+    assert not menu_parser._probe_looks_like_menu(html)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"[OK] {name}")
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Offline checks for dish matching (no network).
+
+Run directly or with pytest.
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def test_inflected_dish_name_matches():
+    """Fuzzy fallback finds inflected forms of the dish name."""
+    from utils import text_utils
+    from utils.text_utils import find_dish_in_text
+
+    if text_utils.process is None:
+        print("[SKIP] rapidfuzz is not installed")
+        return
+
+    text = "Спагетти с карбонарой 450 ₽"
+    assert find_dish_in_text("карбонара", text) == text.lower().index("карбонарой")
+
+
+def test_similar_short_word_does_not_match():
+    """"Суши" must not match "сушки": the bot would show a wrong price."""
+    from utils.text_utils import find_dish_in_text
+
+    assert find_dish_in_text("суши", "сушки 100") is None
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"[OK] {name}")
@@ -0,0 +1,190 @@
+"""
+Shared Playwright browser helpers.
+"""
+import asyncio
+import logging
+import re
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Requests aborted during page rendering: menu text needs neither styling
+# nor media, and trackers are blocked by host (page documents never are)
+BLOCKED_RESOURCE_TYPES = frozenset({
+    "image", "media", "font", "stylesheet", "websocket", "manifest", "other",
+})
+BLOCKED_HOST_RE = re.compile(
+    r"google-analytics|googletagmanager|facebook|yandex\.metrica|mc\.yandex",
+    re.I,
+)
+
+CONTEXT_OPTIONS = {
+    "viewport": {"width": 1280, "height": 720},
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+}
+
+
+async def launch_browser(playwright):
+    """
+    Get a Chromium browser for the given Playwright instance.
+    
+    If BROWSER_CDP_URL is set, connects to an already running Chromium
+    (e.g. started as a sidecar with --remote-debugging-port=9222), so no
+    browser is launched per call. Falls back to a local headless launch
+    if the connection fails.
+    """
+    if settings.browser_cdp_url:
+        try:
+            browser = await playwright.chromium.connect_over_cdp(settings.browser_cdp_url)
+            logger.debug(f"[BROWSER] Connected over CDP: {settings.browser_cdp_url}")
+            return browser
+        except Exception as e:
+            logger.warning(f"[BROWSER] CDP connect failed ({settings.browser_cdp_url}): {e}")
+    
+    return await playwright.chromium.launch(headless=True)
+
+
+async def block_heavy_resources(route) -> None:
+    """
+    Playwright route handler: abort heavy or tracking requests.
+    
+    Trackers are matched by host only (a "?utm_source=facebook" query is
+    not a tracker), and page documents are never aborted.
+    """
+    request = route.request
+    if request.resource_type != "document" and (
+        request.resource_type in BLOCKED_RESOURCE_TYPES
+        or BLOCKED_HOST_RE.search(urlsplit(request.url).hostname or "")
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class BrowserManager:
+    """
+    Lazily started Chromium shared by all browser-based services.
+    
+    Launching Chromium takes ~0.5-1s, so the browser is started once.
+    Browser contexts are pooled too: at most settings.browser_contexts are
+    open, and a released context is reused by the next caller.
+    """
+    
+    def __init__(self):
+        self._playwright = None
+        self._browser = None
+        self._lock = asyncio.Lock()
+        self._idle_contexts: List = []
+        self._context_slots = asyncio.Semaphore(settings.browser_contexts)
+        self._warm_up_task: Optional[asyncio.Task] = None
+    
+    async def get_browser(self):
+        """Get the shared browser, starting Playwright on first use."""
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                from playwright.async_api import async_playwright
+                
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                
+                self._browser = await launch_browser(self._playwright)
+                logger.info("[BROWSER] Shared browser started")
+            
+            return self._browser
+    
+    def start_warm_up(self) -> None:
+        """Start the browser and fill the context pool in the background."""
+        if self._warm_up_task is None or self._warm_up_task.done():
+            self._warm_up_task = asyncio.create_task(self._warm_up())
+    
+    async def _warm_up(self) -> None:
+        """Open settings.browser_contexts contexts and return them to the pool."""
+        results = await asyncio.gather(
+            *(self.acquire_context() for _ in range(settings.browser_contexts)),
+            return_exceptions=True,
+        )
+        
+        contexts = [r for r in results if not isinstance(r, BaseException)]
+        for context in contexts:
+            await self.release_context(context)
+        
+        if len(contexts) < len(results):
+            # Browser stays lazy: the first caller starts it instead
+            error = next(r for r in results if isinstance(r, BaseException))
+            logger.warning(f"[BROWSER] Warm-up failed: {error}")
+        else:
+            logger.info(f"[BROWSER] Warmed up {len(contexts)} contexts")
+    
+    async def acquire_context(self):
+        """
+        Take a browser context from the pool (waits if all are in use).
+        
+        Resource blocking is installed once per context, so pages opened
+        in it don't need their own routes. Must be paired with
+        release_context().
+        """
+        await self._context_slots.acquire()
+        try:
+            browser = await self.get_browser()
+            
+            while self._idle_contexts:
+                context = self._idle_contexts.pop()
+                if context.browser is browser:
+                    return context
+            
+            context = await browser.new_context(**CONTEXT_OPTIONS)
+            await context.route("**/*", block_heavy_resources)
+            return context
+        except BaseException:
+            self._context_slots.release()
+            raise
+    
+    async def release_context(self, context) -> None:
+        """Return a context to the pool, closing the pages left open in it."""
+        try:
+            for page in context.pages:
+                await page.close()
+            self._idle_contexts.append(context)
+        except Exception as e:
+            logger.warning(f"[BROWSER] Dropping broken context: {e}")
+            try:
+                await context.close()
+            except Exception:
+                pass
+        finally:
+            self._context_slots.release()
+    
+    @asynccontextmanager
+    async def context(self):
+        """Pooled browser context for the duration of the block."""
+        context = await self.acquire_context()
+        try:
+            yield context
+        finally:
+            await self.release_context(context)
+    
+    async def close(self) -> None:
+        """Close the shared browser and stop Playwright."""
+        if self._warm_up_task and not self._warm_up_task.done():
+            self._warm_up_task.cancel()
+        
+        async with self._lock:
+            self._idle_contexts.clear()  # Closed together with the browser
+            try:
+                if self._browser:
+                    await self._browser.close()
+                if self._playwright:
+                    await self._playwright.stop()
+            except Exception as e:
+                logger.error(f"[BROWSER] Close error: {e}")
+            finally:
+                self._browser = None
+                self._playwright = None
+
+
+# Global browser instance
+browser_manager = BrowserManager()
@@ -0,0 +1,117 @@
+"""
+In-memory caching helpers shared by the services.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Dict with per-entry expiry and a size cap.
+    
+    When full, the oldest stored entries are evicted first. Storing a key
+    again moves it to the end. Values may be None: pass a sentinel default
+    to get() to tell a cached None from a miss.
+    
+    With max_size set, values must support len() (e.g. page texts) and
+    their total length is capped as well.
+    """
+    
+    def __init__(self, max_entries: int, ttl: float, max_size: Optional[int] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_size = max_size
+        self._size = 0
+        self._entries: Dict[Hashable, tuple] = {}  # key -> (expires_at, value), oldest first
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value, or default if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return default
+        return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value for ttl seconds (default: the cache TTL)."""
+        self._remove(key)
+        size = len(value) if self.max_size is not None else 0
+        if self.max_size is not None and size > self.max_size:
+            return
+        
+        while self._entries and (
+            len(self._entries) >= self.max_entries
+            or (self.max_size is not None and self._size + size > self.max_size)
+        ):
+            self._remove(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._size += size
+    
+    def _remove(self, key: Hashable) -> None:
+        """Drop entry if present, keeping the total size up to date."""
+        entry = self._entries.pop(key, None)
+        if entry is not None and self.max_size is not None:
+            self._size -= len(entry[1])
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SingleFlight:
+    """
+    Run one task per key: concurrent calls with the same key share it.
+    
+    The task is cancelled once every caller waiting on it is gone, and a
+    caller being cancelled does not cancel the others.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+    
+    async def run(self, key: Hashable, make_coro: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await the task for key, starting it with make_coro() if none is running.
+        
+        Args:
+            key: Identity of the work (e.g. site URL)
+            make_coro: Creates the coroutine; called only when no task is in flight
+        
+        Returns:
+            Result of the shared task
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(make_coro())
+            self._inflight[key] = task
+        else:
+            logger.debug(f"Joining in-flight task: {key}")
+        
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # Shield: one caller being cancelled must not cancel the others
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if self._waiters[task] == 0:
+                # Last waiter gone: forget the task, stop it if still running
+                del self._waiters[task]
+                if self._inflight.get(key) is task:
+                    del self._inflight[key]
+                task.cancel()
+    
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -0,0 +1,34 @@
+"""
+Thread-safe lxml parsing of downloaded pages.
+"""
+import re
+import threading
+
+import lxml.html
+
+# libxml2 drops everything after </html>; let the parser close the root itself
+_ROOT_CLOSE_TAG_RE = re.compile(r"</(?:body|html)\s*>", re.I)
+
+# lxml parsers must not be shared between threads (pages are parsed in
+# asyncio.to_thread workers): one per thread, created on first use
+_parser_local = threading.local()
+
+
+def _html_parser() -> lxml.html.HTMLParser:
+    """HTML parser of the current thread."""
+    parser = getattr(_parser_local, "parser", None)
+    if parser is None:
+        # Pages are decoded by http_client; re-encoded as UTF-8 so meta charset is ignored
+        parser = _parser_local.parser = lxml.html.HTMLParser(encoding="utf-8")
+    return parser
+
+
+def parse_html(html: str) -> lxml.html.HtmlElement:
+    """
+    Parse page HTML into an lxml document.
+    
+    Content after stray </body>/</html> tags is kept, and bytes input
+    tolerates XML declarations.
+    """
+    html = _ROOT_CLOSE_TAG_RE.sub("", html)
+    return lxml.html.document_fromstring(html.encode("utf-8", "replace"), parser=_html_parser())
@@ -2,8 +2,10 @@
 Async HTTP client with rate limiting, retries, and timeout handling.
 """
 import asyncio
+import codecs
 import logging
-from typing import Optional, Dict, Any
+import re
+from typing import Optional, Dict, Any, Tuple
 from collections import defaultdict
 import time
 
@@ -11,9 +13,46 @@ import aiohttp
 from aiohttp import ClientTimeout, ClientError
 
 from config import settings
+from utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Successful GET responses are reused for the same URL within this window.
+# Each response cache holds at most this many entries and characters of text
+RESPONSE_CACHE_TTL_SECONDS = 60
+RESPONSE_CACHE_MAX_ENTRIES = 256
+RESPONSE_CACHE_MAX_CHARS = 16 * 1024 * 1024
+
+# Larger bodies (scanned PDF menus, videos, ...) are dropped while downloading
+MAX_RESPONSE_BYTES = 10 * 1024 * 1024
+_BINARY_CONTENT_TYPES = ("image/", "video/", "audio/", "font/", "application/pdf", "application/zip")
+
+# <meta charset="..."> / <meta http-equiv=... content="text/html; charset=...">
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+
+def _resolve_charset(response: aiohttp.ClientResponse, body: bytes) -> str:
+    """
+    Pick encoding for responses without charset in Content-Type.
+    
+    Reads the <meta> charset declaration from the start of the body instead
+    of running statistical detection; falls back to utf-8, then cp1251
+    (common on older Russian sites).
+    """
+    match = _META_CHARSET_RE.search(body, 0, 4096)
+    if match:
+        encoding = match.group(1).decode("ascii")
+        try:
+            return codecs.lookup(encoding).name
+        except LookupError:
+            pass
+    
+    try:
+        body.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp1251"
+
 
 class RateLimiter:
     """Token bucket rate limiter per domain."""
@@ -48,13 +87,31 @@ class HttpClient:
             requests_per_second=1.0 / settings.yandex_delay_seconds
         )
         self._twogis_rate_limiter = RateLimiter(requests_per_second=10.0)
+        # (url, params) -> response text. Responses cached for longer than the
+        # default (2GIS firm pages) are kept apart, so a burst of short-lived
+        # probe responses cannot evict them
+        self._response_cache = TTLCache(
+            RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS, max_size=RESPONSE_CACHE_MAX_CHARS
+        )
+        self._long_response_cache = TTLCache(
+            RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS, max_size=RESPONSE_CACHE_MAX_CHARS
+        )
     
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session."""
         if self._session is None or self._session.closed:
             timeout = ClientTimeout(total=settings.request_timeout_seconds)
+            # Keep connections alive between requests to the same site
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=10,
+                keepalive_timeout=30,
+                ttl_dns_cache=300,
+            )
             self._session = aiohttp.ClientSession(
                 timeout=timeout,
+                connector=connector,
+                fallback_charset_resolver=_resolve_charset,
                 headers={
                     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
                     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -87,20 +144,78 @@ class HttpClient:
         headers: Optional[Dict[str, str]] = None,
         max_retries: int = 3,
         skip_rate_limit: bool = False,
+        cache_ttl: Optional[float] = None,
     ) -> Optional[str]:
         """
         Perform GET request with rate limiting and retries.
         
+        Successful responses are cached for RESPONSE_CACHE_TTL_SECONDS (or
+        cache_ttl), so repeated requests for the same URL (e.g. menu page found
+        by find_menu_url and then loaded by get_menu_text) hit the network once.
+        Requests with custom headers are not cached, and the cache keeps at
+        most RESPONSE_CACHE_MAX_CHARS of text (oldest responses go first).
+        
         Args:
             url: Target URL
             params: Query parameters
             headers: Additional headers
             max_retries: Maximum retry attempts
             skip_rate_limit: Skip rate limiting (for APIs with their own limits)
+            cache_ttl: Seconds to cache the response; 0 disables caching
             
         Returns:
             Response text or None on failure
         """
+        _, text = await self.get_with_status(
+            url,
+            params=params,
+            headers=headers,
+            max_retries=max_retries,
+            skip_rate_limit=skip_rate_limit,
+            cache_ttl=cache_ttl,
+        )
+        return text
+    
+    async def get_with_status(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        max_retries: int = 3,
+        skip_rate_limit: bool = False,
+        cache_ttl: Optional[float] = None,
+    ) -> Tuple[Optional[int], Optional[str]]:
+        """
+        Perform GET request like get(), also returning the HTTP status.
+        
+        The status tells a real answer (e.g. 404, or 200 with a binary body)
+        from a failure to get one: it is None after timeouts and connection
+        errors, and 429/5xx if the server kept failing until retries ran out.
+        
+        Args:
+            url: Target URL
+            params: Query parameters
+            headers: Additional headers
+            max_retries: Maximum retry attempts
+            skip_rate_limit: Skip rate limiting (for APIs with their own limits)
+            cache_ttl: Seconds to cache the response; 0 disables caching
+            
+        Returns:
+            (status, text): text is None unless status is 200
+        """
+        if cache_ttl is None:
+            cache_ttl = RESPONSE_CACHE_TTL_SECONDS
+        
+        cache_key = None
+        if headers is None and cache_ttl > 0:
+            cache_key = (url, tuple(sorted(params.items())) if params else None)
+            cached = self._response_cache.get(cache_key)
+            if cached is None:
+                cached = self._long_response_cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Cache hit for {url}")
+                return 200, cached
+        
         domain = self._get_domain(url)
         
         if not skip_rate_limit:
@@ -109,15 +224,23 @@ class HttpClient:
         
         session = await self._get_session()
         
+        status = None
         for attempt in range(max_retries):
             try:
                 logger.debug(f"GET {url} (attempt {attempt + 1}/{max_retries})")
                 
                 async with session.get(url, params=params, headers=headers) as response:
                     logger.debug(f"Response: {response.status} from {domain}")
+                    status = response.status
                     
                     if response.status == 200:
-                        return await response.text()
+                        text = await self._read_text(response, url)
+                        if text is not None and cache_key is not None:
+                            if cache_ttl > RESPONSE_CACHE_TTL_SECONDS:
+                                self._long_response_cache.set(cache_key, text, cache_ttl)
+                            else:
+                                self._response_cache.set(cache_key, text, cache_ttl)
+                        return status, text
                     
                     elif response.status == 429:
                         # Rate limited - exponential backoff
@@ -128,7 +251,7 @@ class HttpClient:
                     
                     elif response.status == 403:
                         logger.warning(f"Access forbidden for {url}")
-                        return None
+                        return status, None
                     
                     elif response.status >= 500:
                         # Server error - retry
@@ -138,7 +261,7 @@ class HttpClient:
                     
                     else:
                         logger.warning(f"Unexpected status {response.status} from {url}")
-                        return None
+                        return status, None
                         
             except asyncio.TimeoutError:
                 logger.warning(f"Timeout for {url}")
@@ -153,7 +276,41 @@ class HttpClient:
                 continue
         
         logger.error(f"All retries failed for {url}")
-        return None
+        return status, None
+    
+    async def _read_text(self, response: aiohttp.ClientResponse, url: str) -> Optional[str]:
+        """
+        Read response body as text, streaming with a size cap.
+        
+        Returns None for binary content types and for bodies larger than
+        MAX_RESPONSE_BYTES (checked against Content-Length up front, then
+        while reading), so huge downloads are aborted early.
+        """
+        if "Content-Type" in response.headers and response.content_type.startswith(_BINARY_CONTENT_TYPES):
+            logger.warning(f"Skipping non-text response ({response.content_type}) from {url}")
+            return None
+        
+        if response.content_length and response.content_length > MAX_RESPONSE_BYTES:
+            logger.warning(f"Skipping {response.content_length} byte response from {url}")
+            return None
+        
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            body.extend(chunk)
+            if len(body) > MAX_RESPONSE_BYTES:
+                logger.warning(f"Aborting download over {MAX_RESPONSE_BYTES} bytes from {url}")
+                return None
+        
+        body = bytes(body)
+        encoding = response.charset
+        if encoding:
+            try:
+                codecs.lookup(encoding)
+            except LookupError:
+                encoding = None
+        if not encoding:
+            encoding = _resolve_charset(response, body)
+        return body.decode(encoding, errors="replace")
     
     async def get_json(
         self,
@@ -202,6 +359,48 @@ class HttpClient:
         
         return None
     
+    async def post_json(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        timeout_seconds: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Perform POST request with JSON body and parse JSON response.
+        
+        Uses the shared session, so repeated calls to the same API reuse
+        its keep-alive connection. Not rate limited (APIs have their own limits).
+        
+        Args:
+            url: Target URL
+            payload: JSON body
+            headers: Additional headers
+            timeout_seconds: Total timeout overriding the session default
+        
+        Returns:
+            Parsed JSON dict or None on failure
+        """
+        session = await self._get_session()
+        # Passing timeout=None would disable the session timeout entirely
+        kwargs: Dict[str, Any] = {}
+        if timeout_seconds is not None:
+            kwargs["timeout"] = ClientTimeout(total=timeout_seconds)
+        
+        try:
+            logger.debug(f"POST JSON {url}")
+            
+            async with session.post(url, json=payload, headers=headers, **kwargs) as response:
+                if response.status == 200:
+                    return await response.json()
+                
+                logger.warning(f"POST {url} failed with status {response.status}")
+                return None
+                
+        except Exception as e:
+            logger.error(f"Error posting JSON to {url}: {e}")
+            return None
+    
     async def close(self) -> None:
         """Close the HTTP session."""
         if self._session and not self._session.closed:
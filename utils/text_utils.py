@@ -3,7 +3,42 @@ Text processing utilities for dish name matching and price extraction.
 """
 import re
 import unicodedata
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # Optional: fuzzy fallback is skipped without rapidfuzz
+    fuzz = process = None
+
+# Minimal similarity (0-100) for the fuzzy dish match fallback
+FUZZY_DISH_SCORE_CUTOFF = 80
+# Inflected/misspelled forms keep the start of at least one dish word
+FUZZY_PREFILTER_PREFIX_CHARS = 3
+# Shorter dish names are too close to other words ("суши" / "сушки")
+FUZZY_MIN_DISH_CHARS = 6
+# Each matched word must keep the dish word's stem: all but the last
+# letters, where Russian inflection happens ("карбонара" / "карбонарой")
+FUZZY_STEM_SUFFIX_CHARS = 2
+
+# Normalization pattern, compiled once
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+# Price patterns (ordered by specificity), compiled once
+_PRICE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        # Price with currency symbol: 650 ₽, 650₽
+        r"(\d{2,5})\s*₽",
+        # Price with "руб": 650 руб, 650руб.
+        r"(\d{2,5})\s*руб\.?",
+        # Price with "р": 650 р, 650р.
+        r"(\d{2,5})\s*р\.?\b",
+        # Price after dash/colon: — 650, : 650
+        r"[—–\-:]\s*(\d{2,5})(?:\s|$|[^\d])",
+        # Standalone number that looks like a price (3-4 digits)
+        r"\b(\d{3,4})\b",
+    )
+]
 
 
 def normalize_text(text: str) -> str:
@@ -24,11 +59,8 @@ def normalize_text(text: str) -> str:
     # Lowercase
     text = text.lower()
     
-    # Replace multiple whitespace with single space
-    text = re.sub(r"\s+", " ", text)
-    
-    # Remove leading/trailing whitespace
-    text = text.strip()
+    # Replace multiple whitespace with single space, trimming the ends
+    text = " ".join(text.split())
     
     return text
 
@@ -41,7 +73,7 @@ def normalize_for_search(text: str) -> str:
     text = normalize_text(text)
     
     # Remove punctuation but keep spaces
-    text = re.sub(r"[^\w\s]", "", text)
+    text = _PUNCT_RE.sub("", text)
     
     return text
 
@@ -69,22 +101,8 @@ def extract_price(text: str, dish_position: int = 0, context_chars: int = 100) -
     end = min(len(text), dish_position + context_chars)
     context = text[start:end]
     
-    # Price patterns (ordered by specificity)
-    patterns = [
-        # Price with currency symbol: 650 ₽, 650₽
-        r"(\d{2,5})\s*₽",
-        # Price with "руб": 650 руб, 650руб.
-        r"(\d{2,5})\s*руб\.?",
-        # Price with "р": 650 р, 650р.
-        r"(\d{2,5})\s*р\.?\b",
-        # Price after dash/colon: — 650, : 650
-        r"[—–\-:]\s*(\d{2,5})(?:\s|$|[^\d])",
-        # Standalone number that looks like a price (3-4 digits)
-        r"\b(\d{3,4})\b",
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, context, re.IGNORECASE)
+    for pattern in _PRICE_PATTERNS:
+        match = pattern.search(context)
         if match:
             try:
                 price = float(match.group(1))
@@ -145,13 +163,34 @@ def find_dish_in_text(dish_name: str, text: str) -> Optional[int]:
     1. Exact match (normalized)
     2. All words present
     3. Main word present (longest word in dish name)
+    4. Fuzzy match of the dish words (if rapidfuzz is installed)
     
     Returns:
         Position of match or None if not found
     """
-    dish_normalized = normalize_for_search(dish_name)
+    return _find_normalized_dish(normalize_for_search(dish_name), normalize_for_search(text))
+
+
+def find_dishes_in_text(dish_names: List[str], text: str) -> Dict[str, Optional[int]]:
+    """
+    Find several dish names in the same text.
+    
+    The text is normalized once and shared by all lookups instead of
+    being re-normalized for every dish as with find_dish_in_text.
+    
+    Returns:
+        Mapping of dish name to position of match (or None)
+    """
     text_normalized = normalize_for_search(text)
     
+    return {
+        dish_name: _find_normalized_dish(normalize_for_search(dish_name), text_normalized)
+        for dish_name in dish_names
+    }
+
+
+def _find_normalized_dish(dish_normalized: str, text_normalized: str) -> Optional[int]:
+    """Match strategies of find_dish_in_text over already normalized strings."""
     if not dish_normalized or not text_normalized:
         return None
     
@@ -185,4 +224,49 @@ def find_dish_in_text(dish_name: str, text: str) -> Optional[int]:
         if pos >= 0:
             return pos
     
+    # Strategy 4: Fuzzy match (inflected/misspelled forms), if rapidfuzz is installed.
+    # A plain substring check rules out most texts before scoring every word window.
+    if process is not None and len(dish_normalized) >= FUZZY_MIN_DISH_CHARS:
+        if not any(word[:FUZZY_PREFILTER_PREFIX_CHARS] in text_normalized for word in dish_words):
+            return None
+        return _fuzzy_find(dish_normalized, text_normalized)
+    
     return None
+
+
+def _fuzzy_find(dish_normalized: str, text_normalized: str) -> Optional[int]:
+    """Find position of the word window most similar to the dish name."""
+    words = text_normalized.split(" ")
+    dish_words = dish_normalized.split()
+    window_size = len(dish_words)
+    
+    if len(words) < window_size:
+        return None
+    
+    stems = [word[:max(len(word) - FUZZY_STEM_SUFFIX_CHARS, 3)] for word in dish_words]
+    
+    # Candidate windows of the same word count as the dish whose words keep
+    # the dish words' stems, with their offsets
+    windows = []
+    offsets = []
+    offset = 0
+    for i in range(len(words) - window_size + 1):
+        window = words[i:i + window_size]
+        if all(word.startswith(stem) for word, stem in zip(window, stems)):
+            windows.append(" ".join(window))
+            offsets.append(offset)
+        offset += len(words[i]) + 1
+    
+    if not windows:
+        return None
+    
+    match = process.extractOne(
+        dish_normalized,
+        windows,
+        scorer=fuzz.ratio,
+        score_cutoff=FUZZY_DISH_SCORE_CUTOFF,
+    )
+    if match is None:
+        return None
+    
+    return offsets[match[2]]